@@ -0,0 +1,2 @@
+# Load .env and resolve shared paths once, before any agent module reads os.environ
+from agents import _bootstrap  # noqa: F401
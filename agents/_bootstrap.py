@@ -0,0 +1,94 @@
+"""
+One-time environment bootstrap for the agent packages.
+
+agent.py, rec_agent.py and summary_agent.py (in both the study and wellness
+packages) each used to resolve the backend root, probe for .env files and call
+load_dotenv() on import, and the MCP singleton recomputed its server path and
+subprocess environment on top of that. This module does that work once per
+process; everything else imports the results from here.
+
+Imported by `agents/__init__.py`, so .env is loaded before any agent module
+reads os.environ. Also sets the level of the `agents` loggers from LOG_LEVEL
+(default INFO).
+"""
+
+import logging
+import os
+from pathlib import Path
+from types import MappingProxyType
+
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+# agents/_bootstrap.py -> agents/ -> backend root
+AGENTS_ROOT = Path(__file__).resolve().parent
+BACKEND_ROOT = AGENTS_ROOT.parent
+
+# Load environment variables FIRST - try .env.production (Cloud Run), then .env (local dev)
+_env_production = BACKEND_ROOT / ".env.production"
+_env_file = BACKEND_ROOT / ".env"
+
+_loaded_env = next((path for path in (_env_production, _env_file) if path.exists()), None)
+if _loaded_env:
+    load_dotenv(_loaded_env)
+
+# Configure logging once: basicConfig is a no-op if main.py already set up handlers
+logging.basicConfig(level=logging.INFO)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+logging.getLogger("agents").setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+
+if _loaded_env:
+    logger.debug(f"✅ Loaded {_loaded_env.name} from: {_loaded_env}")
+else:
+    logger.debug("ℹ️  No .env file found, using system environment variables")
+
+# Get MODEL_NAME with fallback default
+DEFAULT_MODEL_NAME = "gemini-2.0-flash"
+
+
+def _resolve_model_name() -> str:
+    """Read MODEL_NAME, falling back to the default when it is unset, empty or 'none'"""
+    model_name = os.getenv("MODEL_NAME", DEFAULT_MODEL_NAME)
+    if not model_name or model_name.lower() == "none":
+        return DEFAULT_MODEL_NAME
+    return model_name
+
+
+# Gemini model used by every agent
+MODEL_NAME = _resolve_model_name()
+
+# MCP Server Path - Use wrapper script to avoid import issues
+MCP_SERVER_PATH = str(AGENTS_ROOT / "mcp_server" / "run_server.py")
+
+
+def _build_mcp_env() -> dict:
+    """
+    Prepare environment variables for the MCP server subprocess.
+    The subprocess inherits all environment variables from parent process.
+    """
+    mcp_env = os.environ.copy()
+
+    # Ensure SERVICE_ACCOUNT_KEY_PATH is set (use from env or default path)
+    if not mcp_env.get("SERVICE_ACCOUNT_KEY_PATH"):
+        # Default to backend root's firebase-service-account.json
+        default_service_account = BACKEND_ROOT / "firebase-service-account.json"
+        if default_service_account.exists():
+            mcp_env["SERVICE_ACCOUNT_KEY_PATH"] = str(default_service_account)
+            logger.debug(f"ℹ️  Using default Firebase credentials: {default_service_account}")
+
+    # Missing credentials are worth surfacing; the rest is debug-only
+    for key in ("SERVICE_ACCOUNT_KEY_PATH", "GEMINI_API_KEY"):
+        if not mcp_env.get(key):
+            logger.warning(f"❌ MCP environment: {key} NOT SET")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔧 MCP Environment Setup:")
+        logger.debug(f"   SERVICE_ACCOUNT_KEY_PATH: {'SET' if mcp_env.get('SERVICE_ACCOUNT_KEY_PATH') else '❌ NOT SET'}")
+        logger.debug(f"   GEMINI_API_KEY: {'SET' if mcp_env.get('GEMINI_API_KEY') else '❌ NOT SET'}")
+        logger.debug(f"   MODEL_NAME: {mcp_env.get('MODEL_NAME', 'NOT SET')}")
+
+    return mcp_env
+
+
+# Environment handed to the MCP server subprocess (read-only snapshot)
+MCP_ENV = MappingProxyType(_build_mcp_env())
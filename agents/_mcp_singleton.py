@@ -0,0 +1,120 @@
+"""
+Process-wide MCP toolset shared by the study and wellness agents.
+
+Each MCPToolset(StdioConnectionParams(...)) spawns its own `run_server.py`
+subprocess with its own Firebase client. Both agent packages used to build
+one at import, paying two Python + Firebase cold starts for the same server.
+get_mcp_toolset() builds it once on first use and hands the same instance to
+every caller.
+
+Transport is selected with MCP_TRANSPORT:
+- "stdio": spawn `mcp_server/run_server.py` and talk JSON-RPC over its pipes
+- "inprocess": import the server's tool functions and call them directly
+Defaults to "stdio" everywhere; "inprocess" is opt-in. If the server module
+fails to import (missing, or its own setup raises), falls back to stdio.
+"""
+
+import asyncio
+import atexit
+import importlib
+import logging
+import os
+from functools import lru_cache
+
+from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
+from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
+from mcp import StdioServerParameters
+
+from agents._bootstrap import MCP_ENV, MCP_SERVER_PATH
+from agents._mcp_tools import CachedMCPToolset, DeferredWriteToolset, InProcessToolset
+
+logger = logging.getLogger(__name__)
+
+# Module holding the MCP tool functions (importable when agents/ is on sys.path)
+MCP_INPROCESS_MODULE = os.getenv("MCP_INPROCESS_MODULE", "mcp_server.tools")
+
+# Stdio session/call timeout in seconds. The server currently initializes Firebase
+# before answering `initialize`, hence 30s; lower it once the server inits lazily.
+MCP_TIMEOUT = float(os.getenv("MCP_TIMEOUT", "30"))
+
+
+def _resolve_transport() -> str:
+    """Pick the MCP transport from MCP_TRANSPORT (see module docstring)"""
+    transport = os.getenv("MCP_TRANSPORT", "stdio").strip().lower()
+    if transport != "inprocess":
+        return "stdio"
+
+    # Import it here rather than in get_tools(): the module's own setup (e.g. a
+    # second firebase_admin.initialize_app) can fail, and stdio still works then
+    try:
+        importlib.import_module(MCP_INPROCESS_MODULE)
+    except Exception as e:
+        logger.warning(f"⚠️  MCP module {MCP_INPROCESS_MODULE} failed to import, falling back to stdio transport: {e}")
+        return "stdio"
+    return "inprocess"
+
+
+@lru_cache(maxsize=None)
+def get_mcp_toolset() -> DeferredWriteToolset:
+    """
+    Get the shared MCP toolset (for Sahay ecosystem data access).
+
+    The toolset is created lazily on first call; with the stdio transport the
+    MCP subprocess itself is started by ADK on the first tool listing/call.
+
+    Returns:
+        DeferredWriteToolset over a CachedMCPToolset wrapping either an
+        InProcessToolset or a stdio MCPToolset
+    """
+    if _resolve_transport() == "inprocess":
+        return DeferredWriteToolset(CachedMCPToolset(InProcessToolset(MCP_INPROCESS_MODULE)))
+
+    # ⚡ CRITICAL: MCP_TIMEOUT (30s default) covers Firebase startup inside the server
+    # Read-only tool results are cached (TTL 120s) so repeated context queries
+    # from the recommendation agent and the safety loop skip the Firestore round-trip.
+    # save_complete_wellness_analysis runs in the background (see DeferredWriteToolset)
+    return DeferredWriteToolset(CachedMCPToolset(
+        MCPToolset(
+            connection_params=StdioConnectionParams(
+                server_params=StdioServerParameters(
+                    command="python",
+                    args=[MCP_SERVER_PATH],
+                    env=dict(MCP_ENV)  # Pass complete environment to subprocess
+                ),
+                timeout=MCP_TIMEOUT  # Default 5s is too short for the server's Firebase startup
+            )
+        )
+    ))
+
+
+async def warmup() -> int:
+    """
+    Start the shared MCP toolset ahead of the first request.
+
+    Listing tools makes ADK spawn the stdio server and run the initialize
+    handshake (or import the in-process tool module), which otherwise happens
+    inside the first user's analysis. Failures are logged, not raised.
+
+    Returns:
+        Number of tools exposed, or 0 if warmup failed
+    """
+    try:
+        tools = await get_mcp_toolset().get_tools()
+    except Exception as e:
+        logger.warning(f"⚠️  MCP warmup failed (will retry on first request): {e}")
+        return 0
+    logger.info(f"✅ MCP toolset warmed up ({len(tools)} tools)")
+    return len(tools)
+
+
+@atexit.register
+def _close_mcp_toolset():
+    """Shut down the MCP subprocess on interpreter exit (best effort)"""
+    if get_mcp_toolset.cache_info().currsize == 0:
+        return
+    try:
+        asyncio.run(get_mcp_toolset().close())
+    except Exception:
+        # The owning event loop is usually gone by now; the subprocess exits
+        # on its own once our end of the stdio pipes closes.
+        pass
@@ -0,0 +1,431 @@
+"""
+Shared MCP toolset wrappers for the study and wellness agents.
+
+Both agent packages talk to the same Sahay MCP server, so the wrappers that
+change *how* MCP tools are invoked (caching, in-process dispatch, etc.) live
+here instead of being duplicated in each package.
+"""
+
+import asyncio
+import functools
+import importlib
+import inspect
+import json
+import logging
+import uuid
+from typing import Any, Optional
+
+from cachetools import TTLCache
+from google.cloud.firestore_v1 import SERVER_TIMESTAMP
+from google.genai import types
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools import ToolContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.function_tool import FunctionTool
+
+logger = logging.getLogger(__name__)
+
+# Tools exposed by the Sahay MCP server (see RECOMMENDATION_AGENT_PROMPT / SAFETY_REFINER_PROMPT)
+MCP_TOOL_NAMES = (
+    "eisenhower_get_tasks",
+    "analyze_task_distribution",
+    "daily_data_get_monthly",
+    "stats_monthly_overview",
+    "pomodoro_get_analytics",
+    "analyze_pomodoro_effectiveness",
+    "analyze_user_study_patterns",
+    "get_wellness_context",
+    "get_mock_wearable_data",
+    "save_complete_wellness_analysis",
+)
+
+# Read-only MCP tools whose results can be reused for a short window.
+# Anything that writes (e.g. save_complete_wellness_analysis) is never cached.
+_READ_ONLY_PREFIXES = ("get_", "analyze_", "stats_")
+_READ_ONLY_INFIXES = ("_get_",)
+
+# Independent reads the recommendation agent asks for at the start of most
+# sessions, as (tool name, bundle args forwarded to it)
+CONTEXT_BUNDLE_CALLS = (
+    ("eisenhower_get_tasks", ("userId",)),
+    ("stats_monthly_overview", ("userId", "year", "month")),
+    ("analyze_pomodoro_effectiveness", ("userId", "days")),
+    ("analyze_user_study_patterns", ("userId", "days")),
+    ("get_wellness_context", ("userId",)),
+)
+
+
+def is_read_only_tool(name: str) -> bool:
+    """Return True if an MCP tool only reads data and is safe to cache"""
+    return name.startswith(_READ_ONLY_PREFIXES) or any(
+        infix in name for infix in _READ_ONLY_INFIXES
+    )
+
+
+class _CachedTool(BaseTool):
+    """Wraps a single MCP tool and memoizes successful results per agent invocation"""
+
+    def __init__(self, tool: BaseTool, cache: TTLCache):
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            is_long_running=tool.is_long_running,
+            custom_metadata=tool.custom_metadata,
+        )
+        self._tool = tool
+        self._cache = cache
+
+    def _get_declaration(self):
+        return self._tool._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        # Scoped to the invocation (one analysis run) so a later run never sees
+        # reads from before its own or anyone else's writes. Args are LLM-filled
+        # JSON values (may contain lists), so hash a canonical dump
+        key = (tool_context.invocation_id, self.name, json.dumps(args, sort_keys=True, default=str))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = await self._tool.run_async(args=args, tool_context=tool_context)
+
+        # Don't pin failures (MCP errors or ADK error dicts) in the cache
+        if isinstance(result, dict) and (result.get("isError") or "error" in result):
+            return result
+        self._cache[key] = result
+        return result
+
+
+class CachedMCPToolset(BaseToolset):
+    """
+    MCPToolset decorator that caches read-only tool results.
+
+    The recommendation prompt asks the model to pull context eagerly
+    (tasks, monthly stats, pomodoro analytics, ...), and the same
+    (tool, userId, month) calls are repeated across agents and safety-loop
+    iterations. Each repeat is a Firestore round-trip through the MCP server,
+    so identical read-only calls within `ttl` seconds are served from memory.
+
+    Entries are keyed by ADK invocation, i.e. one analysis run: the
+    recommendation agent and the safety refiner reuse each other's reads
+    within that run, but the next run (after save_complete_wellness_analysis
+    or the priority-matrix routes have written tasks and stats) reads fresh.
+    Old runs' entries just age out of the TTL/LRU.
+
+    Args:
+        toolset: The underlying MCPToolset
+        maxsize: Maximum number of cached tool results
+        ttl: Seconds a cached result stays valid
+    """
+
+    def __init__(self, toolset: BaseToolset, *, maxsize: int = 1024, ttl: float = 120):
+        super().__init__()
+        self._toolset = toolset
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get_tools(
+        self, readonly_context: Optional[ReadonlyContext] = None
+    ) -> list[BaseTool]:
+        tools = await self._toolset.get_tools(readonly_context)
+        return [
+            _CachedTool(tool, self._cache) if is_read_only_tool(tool.name) else tool
+            for tool in tools
+        ]
+
+    def clear(self):
+        """Drop all cached tool results"""
+        self._cache.clear()
+
+    async def close(self) -> None:
+        await self._toolset.close()
+
+
+def _off_loop(func):
+    """Async wrapper running a sync tool function via asyncio.to_thread (keeps its signature)"""
+    if inspect.iscoroutinefunction(func):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
+
+
+class InProcessToolset(BaseToolset):
+    """
+    Calls the MCP server's tool functions directly instead of over stdio.
+
+    The stdio transport forks `run_server.py` and frames every call as a
+    JSON-RPC message over the subprocess pipes. When the server package is
+    importable from this process (same container), the tool functions can be
+    wrapped as ADK FunctionTools and awaited directly, with the same
+    get_tools()/run_async() interface the agents already use. Sync functions
+    (the server's Firestore calls) run in a worker thread, so they don't block
+    the event loop and ContextBundleTool's gather still overlaps them.
+
+    Args:
+        module_name: Module that defines the MCP tool functions
+        tool_names: Names of the functions to expose as tools
+    """
+
+    def __init__(self, module_name: str = "mcp_server.tools", tool_names=MCP_TOOL_NAMES):
+        super().__init__()
+        self._module_name = module_name
+        self._tool_names = tool_names
+        self._tools: Optional[list[BaseTool]] = None
+
+    async def get_tools(
+        self, readonly_context: Optional[ReadonlyContext] = None
+    ) -> list[BaseTool]:
+        if self._tools is None:
+            module = importlib.import_module(self._module_name)
+            self._tools = [
+                FunctionTool(_off_loop(getattr(module, name)))
+                for name in self._tool_names
+                if callable(getattr(module, name, None))
+            ]
+        return self._tools
+
+
+class ContextBundleTool(BaseTool):
+    """
+    Synthetic `fetch_context_bundle` tool that runs the canonical context reads concurrently.
+
+    Left to itself the model tends to call eisenhower_get_tasks,
+    stats_monthly_overview, analyze_pomodoro_effectiveness, ... one turn at a
+    time, paying an LLM round-trip plus a Firestore read for each. These reads
+    hit different collections and don't depend on each other, so this tool
+    issues all of them with asyncio.gather and returns the results keyed by
+    tool name. Calls go through the wrapped toolset, so results land in (and
+    are served from) the CachedMCPToolset cache like any other call.
+
+    Args:
+        toolset: Toolset exposing the MCP tools (normally the shared CachedMCPToolset)
+        calls: (tool name, forwarded arg names) pairs to run
+    """
+
+    def __init__(self, toolset: BaseToolset, calls=CONTEXT_BUNDLE_CALLS):
+        super().__init__(
+            name="fetch_context_bundle",
+            description=(
+                "Fetch the user's tasks, monthly stats, Pomodoro effectiveness, "
+                "study patterns and wellness context in one call. Prefer this over "
+                "calling those tools one by one."
+            ),
+        )
+        self._toolset = toolset
+        self._calls = calls
+        self._tools: Optional[dict[str, BaseTool]] = None
+
+    def _get_declaration(self) -> types.FunctionDeclaration:
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters=types.Schema(
+                type=types.Type.OBJECT,
+                properties={
+                    "userId": types.Schema(type=types.Type.STRING, description="User ID"),
+                    "year": types.Schema(type=types.Type.INTEGER, description="Year for monthly stats"),
+                    "month": types.Schema(type=types.Type.INTEGER, description="Month (1-12) for monthly stats"),
+                    "days": types.Schema(type=types.Type.INTEGER, description="Look-back window in days (default 14)"),
+                },
+                required=["userId", "year", "month"],
+            ),
+        )
+
+    async def _call(self, name: str, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        tool = self._tools.get(name)
+        if tool is None:
+            return {"error": f"Tool {name} is not available"}
+        try:
+            return await tool.run_async(args=args, tool_context=tool_context)
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        if self._tools is None:
+            self._tools = {tool.name: tool for tool in await self._toolset.get_tools(tool_context)}
+
+        bundle_args = {"days": 14, **args}
+        results = await asyncio.gather(*(
+            self._call(name, {key: bundle_args[key] for key in keys if key in bundle_args}, tool_context)
+            for name, keys in self._calls
+        ))
+        return {name: result for (name, _), result in zip(self._calls, results)}
+
+
+class _DeferredTool(BaseTool):
+    """Exposes a write tool as `<name>_async`, which queues the call and acknowledges immediately"""
+
+    def __init__(self, tool: BaseTool, owner: "DeferredWriteToolset"):
+        super().__init__(
+            name=f"{tool.name}_async",
+            description=(
+                f"{tool.description or ''}\n\nQueues the save and returns immediately "
+                "with status 'queued'; the write completes in the background. "
+                "A response with success false means the save was not queued."
+            ).strip(),
+            custom_metadata=tool.custom_metadata,
+        )
+        self._tool = tool
+        self._owner = owner
+
+    def _get_declaration(self):
+        declaration = self._tool._get_declaration()
+        if declaration is None:
+            return None
+        return declaration.model_copy(update={"name": self.name, "description": self.description})
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        return await self._owner.submit(self._tool, args, tool_context)
+
+
+class DeferredWriteToolset(BaseToolset):
+    """
+    Runs slow MCP write tools in the background instead of inside the LLM turn.
+
+    save_complete_wellness_analysis writes the summary, recommendations,
+    pathways and tasks to Firestore and can take 10-20s. The safety refiner
+    used to wait on it before calling exit_safety_loop, holding the whole
+    session open on database IO. Each tool in `tool_names` is replaced by a
+    `<name>_async` variant that returns {"success": true, "status": "queued"}.
+
+    The acknowledgement is only sent once the call is durable: its arguments
+    are written to `pending_collection/{session_id}` first, then the real call
+    runs as a background task with retries. The document is deleted when the
+    write succeeds and marked "failed" (with the error) when it gives up, so
+    a save that never completes (instance throttled or restarted after the
+    response) can still be found and replayed. save_status() reports the
+    outcome for the orchestrator's result.
+
+    Calls are idempotent per session_id: a session that is already queued or
+    saved is acknowledged again without a second write (the safety loop can
+    approve more than once across iterations).
+
+    Args:
+        toolset: The underlying toolset
+        tool_names: Write tools to defer
+        dedupe_ttl: Seconds a saved session_id is remembered for idempotency
+        pending_collection: Firestore collection holding the queued calls
+        max_attempts: Tries per call before it is marked failed
+    """
+
+    def __init__(
+        self,
+        toolset: BaseToolset,
+        tool_names=("save_complete_wellness_analysis",),
+        *,
+        dedupe_ttl: float = 3600,
+        pending_collection: str = "pending_wellness_saves",
+        max_attempts: int = 3,
+    ):
+        super().__init__()
+        self._toolset = toolset
+        self._tool_names = frozenset(tool_names)
+        self._pending_collection = pending_collection
+        self._max_attempts = max_attempts
+        self._pending: dict[str, asyncio.Task] = {}
+        self._saved = TTLCache(maxsize=4096, ttl=dedupe_ttl)
+        self._failed = TTLCache(maxsize=4096, ttl=dedupe_ttl)
+
+    async def get_tools(
+        self, readonly_context: Optional[ReadonlyContext] = None
+    ) -> list[BaseTool]:
+        tools = await self._toolset.get_tools(readonly_context)
+        return [
+            _DeferredTool(tool, self) if tool.name in self._tool_names else tool
+            for tool in tools
+        ]
+
+    def _pending_ref(self, session_id: str):
+        # The backend's Firestore client; imported here so the agents package
+        # still loads where firebase_db isn't on the path (e.g. `adk web`)
+        from firebase_db import get_firestore
+        return get_firestore().collection(self._pending_collection).document(session_id)
+
+    def _record_pending(self, tool_name: str, args: dict[str, Any], session_id: str) -> None:
+        self._pending_ref(session_id).set({
+            "tool": tool_name,
+            "args": args,
+            "status": "pending",
+            "created_at": SERVER_TIMESTAMP,
+        })
+
+    async def submit(self, tool: BaseTool, args: dict[str, Any], tool_context: ToolContext) -> dict:
+        """Record `tool` as pending, schedule it in the background and return the acknowledgement"""
+        # Keyed on the run's session id (what the orchestrator looks up), not
+        # whatever id the model wrote into the tool arguments
+        session_id = str(tool_context.state.get("session_id") or args.get("session_id") or uuid.uuid4())
+        ack = {"success": True, "status": "queued", "session_id": session_id}
+        if session_id in self._pending or session_id in self._saved:
+            return {**ack, "duplicate": True}
+
+        try:
+            await asyncio.to_thread(self._record_pending, tool.name, args, session_id)
+        except Exception as e:
+            logger.error(f"❌ Could not queue {tool.name} for session {session_id}: {e}")
+            self._failed[session_id] = str(e)
+            return {"success": False, "status": "error", "session_id": session_id, "error": str(e)}
+
+        self._failed.pop(session_id, None)
+        task = asyncio.create_task(self._run(tool, args, tool_context, session_id))
+        self._pending[session_id] = task
+        task.add_done_callback(lambda _: self._pending.pop(session_id, None))
+        return ack
+
+    async def _run(self, tool: BaseTool, args: dict[str, Any], tool_context: ToolContext, session_id: str):
+        error = None
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                result = await tool.run_async(args=args, tool_context=tool_context)
+            except Exception as e:
+                error = str(e)
+            else:
+                if not (isinstance(result, dict) and (result.get("isError") or "error" in result)):
+                    break
+                error = str(result)
+            logger.warning(f"⚠️  Background {tool.name} attempt {attempt}/{self._max_attempts} failed for session {session_id}: {error}")
+            if attempt < self._max_attempts:
+                await asyncio.sleep(2 ** (attempt - 1))
+        else:
+            logger.error(f"❌ Background {tool.name} failed for session {session_id}: {error}")
+            self._failed[session_id] = error
+            try:
+                await asyncio.to_thread(
+                    self._pending_ref(session_id).update,
+                    {"status": "failed", "error": error, "attempts": self._max_attempts, "updated_at": SERVER_TIMESTAMP},
+                )
+            except Exception as e:
+                logger.error(f"❌ Could not mark {tool.name} failed for session {session_id}: {e}")
+            return
+
+        self._saved[session_id] = True
+        logger.info(f"✅ Background {tool.name} completed for session {session_id}")
+        try:
+            await asyncio.to_thread(self._pending_ref(session_id).delete)
+        except Exception as e:
+            # The save itself succeeded; a replay is idempotent per session_id
+            logger.warning(f"⚠️  Could not clear pending {tool.name} record for session {session_id}: {e}")
+
+    def save_status(self, session_id: str) -> Optional[str]:
+        """"saved", "pending", "failed", or None if no save was submitted for session_id"""
+        if session_id in self._saved:
+            return "saved"
+        if session_id in self._pending:
+            return "pending"
+        if session_id in self._failed:
+            return "failed"
+        return None
+
+    async def drain(self):
+        """Wait for the queued writes started on the running loop (call before it shuts down)"""
+        loop = asyncio.get_running_loop()
+        tasks = [task for task in self._pending.values() if task.get_loop() is loop]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.drain()
+        await self._toolset.close()
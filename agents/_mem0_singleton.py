@@ -0,0 +1,180 @@
+"""
+Process-wide Mem0 memory tool shared by the study and wellness agents.
+
+summary_agent.py and rec_agent.py in both packages used to build their own
+Mem0Tool, i.e. four MemoryClient instances, each validating the API key over
+HTTP at construction and keeping its own connection pool. Every agent now
+binds the methods of the single `mem0_tool` built here.
+
+Searches are also cached briefly per (user, query): the summary and
+recommendation agents commonly issue the same lookup within seconds of each
+other, and a safety-loop retry repeats it again. Identical searches issued
+concurrently (the parallel summary and recommendation agents) share a single
+in-flight request instead of both hitting Mem0.
+
+The MemoryClient itself is created lazily on first use (its constructor pings
+the API) over a pooled keep-alive httpx.Client sized for the worker threads
+the tool calls run on.
+
+When REDIS_URL is set, search results are also kept in Redis
+(`mem0:{user_id}:{blake2b(query)}`, MEM0_REDIS_TTL seconds) so they survive
+across Cloud Run instances and restarts; the in-process cache stays in front.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import httpx
+from cachetools import TTLCache
+from mem0 import MemoryClient
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Connection pool for Mem0 API calls; MemoryClient's default client has a 300s timeout
+MEM0_POOL_SIZE = int(os.getenv("MEM0_POOL_SIZE", "32"))
+MEM0_TIMEOUT = float(os.getenv("MEM0_TIMEOUT", "30"))
+
+# Shared search cache across instances; disabled unless REDIS_URL is set
+REDIS_URL = os.getenv("REDIS_URL")
+MEM0_REDIS_TTL = int(os.getenv("MEM0_REDIS_TTL", "600"))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_mem0_client() -> MemoryClient:
+    """Process-wide MemoryClient, built on first call"""
+    global _client
+    if _client is None:
+        # Calls arrive from asyncio.to_thread workers, so guard the first construction
+        with _client_lock:
+            if _client is None:
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=MEM0_POOL_SIZE,
+                        max_keepalive_connections=MEM0_POOL_SIZE,
+                    ),
+                    timeout=MEM0_TIMEOUT,
+                )
+                _client = MemoryClient(client=http_client)
+    return _client
+
+
+def _build_redis():
+    if not REDIS_URL:
+        return None
+    if not REDIS_AVAILABLE:
+        logger.warning("⚠️  REDIS_URL is set but redis is not installed; Mem0 searches are cached in-process only")
+        return None
+    return redis.Redis.from_url(REDIS_URL, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+
+_redis = _build_redis()
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def _redis_key(user_id: str, normalized_query: str) -> str:
+    query_hash = hashlib.blake2b(normalized_query.encode(), digest_size=16).hexdigest()
+    return f"mem0:{user_id}:{query_hash}"
+
+
+class Mem0Tool():
+    def __init__(self, *, search_cache_size: int = 512, search_cache_ttl: float = 60):
+        self._search_cache = TTLCache(maxsize=search_cache_size, ttl=search_cache_ttl)
+        # (event loop, cache key) -> task for searches currently awaiting Mem0
+        self._inflight_searches = {}
+
+    @property
+    def mem0(self) -> MemoryClient:
+        return get_mem0_client()
+
+    # MemoryClient is a blocking HTTP client; run it in a worker thread so the
+    # summary and recommendation agents' calls don't stall the shared event loop
+    async def search_memory(self, query: str, user_id: str) -> dict:
+        """Search through past conversations and memories"""
+        key = (user_id, _normalize_query(query))
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Tasks are bound to their loop, so in-flight searches are tracked per loop
+        inflight_key = (asyncio.get_running_loop(), key)
+        task = self._inflight_searches.get(inflight_key)
+        if task is None:
+            task = asyncio.ensure_future(self._search(query, user_id, key))
+            self._inflight_searches[inflight_key] = task
+            task.add_done_callback(lambda _: self._inflight_searches.pop(inflight_key, None))
+        # Shielded so one caller being cancelled doesn't cancel the shared search
+        return await asyncio.shield(task)
+
+    async def _search(self, query: str, user_id: str, key: tuple) -> dict:
+        # self.mem0 is resolved in the worker: the first access builds the client
+        result = await asyncio.to_thread(self._search_sync, query, user_id, key)
+        self._search_cache[key] = result
+        return result
+
+    def _search_sync(self, query: str, user_id: str, key: tuple) -> dict:
+        redis_key = _redis_key(*key)
+        if _redis is not None:
+            try:
+                cached = _redis.get(redis_key)
+                if cached is not None:
+                    return json.loads(cached)
+            except redis.RedisError as e:
+                logger.warning(f"⚠️  Redis read failed, searching Mem0 directly: {e}")
+
+        memories = self.mem0.search(query, user_id=user_id, output_format='v1.1')
+        if memories.get('results', []):
+            memory_list = memories['results']
+            memory_context = "\n".join([f"- {mem['memory']}" for mem in memory_list])
+            result = {"status": "success", "memories": memory_context}
+        else:
+            result = {"status": "no_memories", "message": "No relevant memories found"}
+
+        if _redis is not None:
+            try:
+                _redis.setex(redis_key, MEM0_REDIS_TTL, json.dumps(result))
+            except redis.RedisError as e:
+                logger.warning(f"⚠️  Redis write failed: {e}")
+        return result
+
+    async def save_memory(self, content: str, user_id: str) -> dict:
+        """Save important information to memory"""
+        try:
+            result = await asyncio.to_thread(
+                lambda: self.mem0.add([{"role": "user", "content": content}], user_id=user_id, output_format='v1.1')
+            )
+        except Exception as e:
+            return {"status": "error", "message": f"Failed to save memory: {str(e)}"}
+
+        # New memories make this user's cached searches stale
+        for key in [key for key in self._search_cache.keys() if key[0] == user_id]:
+            self._search_cache.pop(key, None)
+        if _redis is not None:
+            await asyncio.to_thread(_invalidate_redis_searches, user_id)
+        return {"status": "success", "message": "Information saved to memory", "result": result}
+
+
+def _invalidate_redis_searches(user_id: str) -> None:
+    try:
+        stale = list(_redis.scan_iter(match=f"mem0:{user_id}:*", count=100))
+        if stale:
+            _redis.delete(*stale)
+    except redis.RedisError as e:
+        logger.warning(f"⚠️  Redis invalidation failed for user {user_id}: {e}")
+
+
+mem0_tool = Mem0Tool()
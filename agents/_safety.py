@@ -0,0 +1,157 @@
+"""
+Local safety pre-check for the safety refinement loop.
+
+A single-pass multi-term scan over the transcript, summary and
+recommendation spots explicit crisis language (self-harm, ...). A hit can
+only make the review stricter: it is recorded under CRISIS_STATE_KEY and the
+reviewer is told to escalate. A miss proves nothing (medication advice,
+unsafe study regimens and paraphrased self-harm aren't keywords), so the LLM
+reviewer still runs unless SAFETY_SKIP_CLEAN_REVIEW explicitly opts into
+approving keyword-clean sessions locally.
+
+Terms are matched in one pass with an Aho-Corasick automaton (pyahocorasick)
+when available, falling back to one compiled alternation regex.
+
+The summary and recommendation agents scan each model response as it is
+produced (flag_crisis_in_response), so by the time the safety loop starts the
+verdict for their outputs is already in state and only the transcript is left
+to scan.
+"""
+
+import json
+import os
+import re
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Lowercase phrases that force the LLM safety reviewer to escalate.
+# Matched at the start of a word, so stems ("suicid", "overdos") cover inflections.
+CRISIS_TERMS = (
+    "suicid",
+    "kill myself", "kill my self", "kill me",
+    "end it all", "end my life", "end my own life",
+    "take my life", "take my own life",
+    "want to die", "wanted to die",
+    "better off dead",
+    "no reason to live",
+    "self-harm", "self harm", "selfharm",
+    "hurt myself", "hurting myself", "hurt my self",
+    "cutting",
+    "overdos",
+    "hopeless",
+    "worthless",
+    "abuse",
+    "assault",
+    "sleep deprivation", "sleep deprived",
+    "skipping meals",
+    "panic attack",
+)
+
+
+def _build_automaton():
+    automaton = ahocorasick.Automaton()
+    for term in CRISIS_TERMS:
+        automaton.add_word(term, len(term))
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton() if AHOCORASICK_AVAILABLE else None
+
+CRISIS_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(term) for term in CRISIS_TERMS) + r")", re.IGNORECASE
+)
+
+# Set by flag_crisis_in_response: True on a hit, False once a clean response was scanned
+CRISIS_STATE_KEY = "crisis_detected"
+
+# Agent outputs covered by flag_crisis_in_response; only rescanned if it never ran
+_GENERATED_STATE_KEYS = ("generated_summary", "recommendation")
+
+
+def has_crisis_terms(text: str) -> bool:
+    """Return True if text contains any crisis / self-harm term"""
+    if not text:
+        return False
+    if _AUTOMATON is None:
+        return CRISIS_PATTERN.search(text) is not None
+
+    text = text.lower()
+    for end, length in _AUTOMATON.iter(text):
+        start = end - length + 1
+        # Same word-start rule as the regex's \b
+        if start == 0 or not (text[start - 1].isalnum() or text[start - 1] == "_"):
+            return True
+    return False
+
+
+def flag_crisis_in_response(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """
+    after_model_callback for the summary and recommendation agents.
+
+    Scans the response text and function-call arguments (structured output
+    arrives as a set_model_response call) and records the verdict under
+    CRISIS_STATE_KEY. Never alters the response.
+    """
+    if llm_response.partial or not llm_response.content or not llm_response.content.parts:
+        return None
+
+    state = callback_context.state
+    for part in llm_response.content.parts:
+        if part.text:
+            text = part.text
+        elif part.function_call and part.function_call.args:
+            text = json.dumps(part.function_call.args, ensure_ascii=False)
+        else:
+            continue
+        if has_crisis_terms(text):
+            state[CRISIS_STATE_KEY] = True
+            return None
+
+    if state.get(CRISIS_STATE_KEY) is None:
+        state[CRISIS_STATE_KEY] = False
+    return None
+
+
+def skip_clean_review_enabled() -> bool:
+    """SAFETY_SKIP_CLEAN_REVIEW opt-in (read per call, so .env load order doesn't matter)"""
+    return os.getenv("SAFETY_SKIP_CLEAN_REVIEW", "false").strip().lower() in ("1", "true", "yes")
+
+
+def precheck_safety_review(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    before_agent_callback for the safety reviewer.
+
+    If the transcript or the generated outputs contain CRISIS_TERMS, sets
+    CRISIS_STATE_KEY so the reviewer prompt demands escalation. Returns None
+    (the reviewer runs as usual) in every case except one: with
+    SAFETY_SKIP_CLEAN_REVIEW enabled and no hit, writes SAFETY_APPROVED to
+    `safety_feedback` (the reviewer's output_key) and returns it as the
+    agent's response, which makes ADK skip the reviewer's model call.
+    """
+    state = callback_context.state
+    flagged = state.get(CRISIS_STATE_KEY)
+    if flagged:
+        return None
+
+    scanned_keys = ("transcript",) if flagged is False else ("transcript", *_GENERATED_STATE_KEYS)
+    if any(has_crisis_terms(str(state.get(key) or "")) for key in scanned_keys):
+        state[CRISIS_STATE_KEY] = True
+        return None
+    state[CRISIS_STATE_KEY] = False
+
+    if not skip_clean_review_enabled():
+        return None
+    state["safety_feedback"] = "SAFETY_APPROVED"
+    return types.Content(role="model", parts=[types.Part(text="SAFETY_APPROVED")])
@@ -0,0 +1,77 @@
+"""
+Structured output schemas for the summary and recommendation agents.
+
+Passed as LlmAgent.output_schema so Gemini is constrained to the shape instead
+of being asked for it in prose. ADK then stores the validated dict under the
+agent's output_key, so the safety refiner and the orchestrator receive
+guaranteed-shape data instead of re-parsing model text.
+
+Field names mirror TranscriptSummary / StatsRecommendations in model.py.
+Fields have no default values because Gemini response schemas reject them.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class Recommendation(BaseModel):
+    title: str
+    description: str = Field(description="Detailed, actionable advice")
+    category: str = Field(description="e.g. study_strategy, time_management, stress_relief, academic_support, self_care")
+
+
+class WellnessExercise(BaseModel):
+    name: str
+    instructions: str = Field(description="Step-by-step guide")
+    duration: str = Field(description="Time needed")
+    best_for: str = Field(description="When to use this")
+
+
+class Resource(BaseModel):
+    type: str = Field(description="Resource type, e.g. app, technique, support, study_tool")
+    title: str
+    description: str = Field(description="How it helps")
+
+
+class WellnessPathway(BaseModel):
+    pathway_name: str
+    pathway_type: str = Field(description="e.g. mindfulness, stress_management, self_care, study_technique, focus_enhancement")
+    description: str = Field(description="Detailed pathway description")
+    duration_days: int = Field(description="Program length in days (usually 7)")
+
+
+class RecommendedTask(BaseModel):
+    task_title: str = Field(description="Specific actionable task")
+    task_description: str = Field(description="What to do and why")
+    priority_classification: str = Field(
+        description="urgent_important, important_not_urgent, urgent_not_important or neither_urgent_nor_important"
+    )
+    suggested_due_days: int = Field(description="Days from today the task is due")
+
+
+class WellnessSummary(BaseModel):
+    """generated_summary for general wellness mode"""
+    summary: str = Field(description="Detailed summary of the conversation")
+    emotions: list[str]
+    focus_areas: list[str] = Field(description="Main topics discussed")
+    tags: list[str] = Field(description="Relevant wellness tags")
+
+
+class StudySummary(WellnessSummary):
+    """generated_summary for study mode"""
+    stress_level: str = Field(description="low, moderate or high")
+    academic_concerns: list[str] = Field(description="Primary study-related concerns")
+
+
+class WellnessRecommendations(BaseModel):
+    """recommendation for general wellness mode"""
+    recommendations: list[Recommendation]
+    wellness_exercises: list[WellnessExercise]
+    resources: list[Resource]
+    wellness_pathways: list[WellnessPathway]
+    recommended_tasks: list[RecommendedTask]
+    tone: str = Field(description="e.g. supportive, encouraging, gentle, motivating")
+
+
+class StudyRecommendations(WellnessRecommendations):
+    """recommendation for study mode"""
+    study_focus_tips: list[str] = Field(description="Specific, actionable study improvements")
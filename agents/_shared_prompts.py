@@ -0,0 +1,237 @@
+"""
+Prompt rendering shared by the study and wellness agents.
+
+A plain-string `instruction` is re-scanned by ADK's state injection on every
+model call, and each safety-loop iteration runs the reviewer and the refiner
+again (up to 3 x 2 renders of multi-KB prompts per session). PromptTemplate
+parses a str.format-style template once at import and renders it from session
+state by joining the pre-split chunks.
+
+The safety prompts and the recommendation prompt's tool-routing section are
+shared by both modes and built here from a per-domain config.
+"""
+
+import json
+import string
+from string import Template
+from typing import Any, Literal, Mapping
+
+from google.adk.agents.readonly_context import ReadonlyContext
+
+_FORMATTER = string.Formatter()
+
+
+class PromptTemplate:
+    """
+    Pre-parsed str.format template usable as an ADK InstructionProvider.
+
+    Uses str.format escaping: `{name}` is substituted from session state and
+    `{{` / `}}` render as literal braces. Placeholders missing from state
+    render as an empty string instead of raising KeyError; structured values
+    (output_schema results stored as dicts) render as JSON.
+
+    Args:
+        template: Prompt text with `{field}` placeholders
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        # [(literal_text, field_name or None), ...]
+        self._parsed = [
+            (literal, field_name)
+            for literal, field_name, _format_spec, _conversion in _FORMATTER.parse(template)
+        ]
+        self.field_names = tuple(name for _, name in self._parsed if name)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Render the template from a mapping of placeholder values"""
+        parts = []
+        for literal, field_name in self._parsed:
+            parts.append(literal)
+            if field_name:
+                value = values.get(field_name)
+                if isinstance(value, (dict, list)):
+                    parts.append(json.dumps(value, ensure_ascii=False))
+                elif value is not None:
+                    parts.append(str(value))
+        return "".join(parts)
+
+    def __call__(self, ctx: ReadonlyContext) -> str:
+        return self.render(ctx.state)
+
+
+# ---------------------------------------------------------------------------
+# Shared prompt bodies for the study and wellness agents
+# ---------------------------------------------------------------------------
+# Both modes used to carry their own copy of the safety and tool-routing
+# prompts with only the domain wording swapped. The text lives here once;
+# `$name` slots (string.Template) are filled from PROMPT_DOMAINS, leaving the
+# `{state}` placeholders and `{{ }}` escapes for PromptTemplate / ADK.
+
+PromptDomain = Literal["study", "wellness"]
+
+PROMPT_DOMAINS = {
+    "study": {
+        "subject": "academic stress",
+        "concern_scope": "academic-specific",
+        "red_flags": [
+            "Self-harm indicators, suicidal ideation",
+            "Dangerous academic advice (extreme sleep deprivation, etc.)",
+            "Inappropriate medical recommendations",
+            "Crisis situations requiring professional help",
+            "Academic burnout reaching dangerous levels",
+            "Extreme academic perfectionism leading to self-harm thoughts",
+            "Unhealthy study habits (extreme sleep deprivation, skipping meals)",
+            "Signs of academic-related panic disorders",
+        ],
+        "advice_check": "Ensure academic advice is healthy and sustainable",
+        "date_hint": "the current date (November 2025)",
+        "tool_routes": [
+            "Exam stress / emotional trends → `daily_data_get_monthly`",
+            "Deadlines / prioritization → `analyze_task_distribution`",
+            "Focus session details → `pomodoro_get_analytics`",
+            "Sleep, stress or activity affecting study → `get_mock_wearable_data`",
+        ],
+        "tool_usage": "Reference specific metrics from tool results in your study advice.",
+    },
+    "wellness": {
+        "subject": "general wellness",
+        "concern_scope": "general wellness",
+        "red_flags": [
+            "Self-harm indicators, suicidal ideation",
+            "Substance abuse concerns",
+            "Abusive relationships",
+            "Severe mental health crises",
+            "Inappropriate medical recommendations",
+            "Crisis situations requiring professional help",
+        ],
+        "advice_check": "Ensure wellness advice is safe and appropriate",
+        "date_hint": "the current date",
+        "tool_routes": [
+            "Stress / emotional trends → `daily_data_get_monthly`",
+            "Workload / prioritization → `analyze_task_distribution`",
+            "Focus session details → `pomodoro_get_analytics`",
+            "Sleep, stress or activity levels → `get_mock_wearable_data`",
+        ],
+        "tool_usage": "Reference specific data points from tool results in your recommendations.",
+    },
+}
+
+_SAFETY_REVIEWER_TEMPLATE = Template("""You are a safety reviewer analyzing AI responses for $subject management.
+
+Current Summary: {generated_summary}
+Current Recommendation: {recommendation}
+Crisis keyword pre-check hit: {crisis_detected}
+
+If the crisis keyword pre-check hit is True, do NOT respond "SAFETY_APPROVED":
+respond with feedback that starts with "ESCALATE:" and names the concern.
+
+Evaluate safety and provide feedback:
+1. Check for harmful advice or crisis indicators
+2. Verify professional tone and appropriateness
+3. Ensure no medical diagnosis/prescription advice
+4. Look for $concern_scope safety concerns
+
+If SAFE and meets all criteria, respond with: "SAFETY_APPROVED"
+If needs improvement, provide specific feedback for refinement.
+
+Focus on these red flags:
+$red_flags
+
+Respond with either "SAFETY_APPROVED" or specific feedback for improvement.""")
+
+_SAFETY_REFINER_TEMPLATE = Template("""You are a safety refiner for $subject AI responses.
+
+Safety Feedback: {safety_feedback}
+Current Summary: {generated_summary}
+Current Recommendation: {recommendation}
+User ID: {userId}
+Session ID: {session_id}
+Mode: {mode}
+
+**CRITICAL WORKFLOW - SAVE THEN EXIT:**
+If feedback is "SAFETY_APPROVED":
+
+1. **FIRST** call the tool: save_complete_wellness_analysis_async
+   
+   Parameters (extract from context variables):
+   - userId: {userId}
+   - session_id: {session_id}
+   - mode: {mode}
+   - transcript_summary: pass {generated_summary} as-is (already structured JSON)
+   - stats_recommendations: pass {recommendation} as-is (already structured JSON)
+   - safety_approved: true
+   - safety_score: 0.95
+   
+2. The save is queued and returns immediately with "success": true, "status": "queued"
+   - Do NOT wait or call the save tool again
+   
+3. Call exit_safety_loop tool to exit
+   
+**IMPORTANT:**
+- Call the save tool exactly once per session
+- If the save call returns an error, output the error but still exit (orchestrator handles fallback)
+- All parameters must be properly formatted JSON
+
+If feedback starts with "ESCALATE:", call escalate_safety_concern with the
+concern instead of saving or refining.
+
+Otherwise, refine the responses based on safety feedback:
+1. Remove harmful content
+2. Add appropriate disclaimers
+3. Improve professional tone
+4. Add crisis resource information if needed
+5. $advice_check
+
+Output refined JSON with same structure but improved safety:
+{{
+    "is_safe": true/false,
+    "safety_score": 0.0-1.0,
+    "concerns": ["list of concerns if any"],
+    "recommendations_approved": true/false,
+    "summary_approved": true/false,
+    "modifications_needed": ["specific changes if needed"],
+    "overall_assessment": "brief assessment"
+}}""")
+
+_TOOL_ROUTING_TEMPLATE = Template("""**DATA TOOLS** (full signatures are provided via function calling):
+User ID: {userId} | For year/month arguments use $date_hint
+
+When to call which tool:
+- Always first: `fetch_context_bundle` (tasks, monthly stats, Pomodoro effectiveness, study patterns, wellness context in one call)
+$tool_routes
+
+$tool_usage""")
+
+
+def _bullets(items: list[str]) -> str:
+    return "\n".join(f"- {item}" for item in items)
+
+
+def build_safety_reviewer(domain: PromptDomain) -> str:
+    """SAFETY_REVIEWER_PROMPT for the given mode"""
+    config = PROMPT_DOMAINS[domain]
+    return _SAFETY_REVIEWER_TEMPLATE.substitute(
+        subject=config["subject"],
+        concern_scope=config["concern_scope"],
+        red_flags=_bullets(config["red_flags"]),
+    )
+
+
+def build_safety_refiner(domain: PromptDomain) -> str:
+    """SAFETY_REFINER_PROMPT for the given mode"""
+    config = PROMPT_DOMAINS[domain]
+    return _SAFETY_REFINER_TEMPLATE.substitute(
+        subject=config["subject"],
+        advice_check=config["advice_check"],
+    )
+
+
+def build_tool_routing(domain: PromptDomain) -> str:
+    """The DATA TOOLS section of RECOMMENDATION_AGENT_PROMPT for the given mode"""
+    config = PROMPT_DOMAINS[domain]
+    return _TOOL_ROUTING_TEMPLATE.substitute(
+        date_hint=config["date_hint"],
+        tool_routes=_bullets(config["tool_routes"]),
+        tool_usage=config["tool_usage"],
+    )
@@ -1,3 +1,10 @@
+from agents._shared_prompts import (
+    PromptTemplate,
+    build_safety_refiner,
+    build_safety_reviewer,
+    build_tool_routing,
+)
+
 SUMMARY_AGENT_PROMPT = """You are an academic stress analysis AI specialized in understanding student mental health and study-related challenges. Analyze student conversations to identify academic stress patterns and study-related emotional states.
 
 Your task:
@@ -15,15 +22,8 @@ Your task:
    - Educational transitions: course-difficulty, subject-struggles, academic-adaptation, learning-style-mismatch
    - Positive academic states: academic-achievement, study-satisfaction, learning-joy, academic-confidence, study-progress
 
-Always respond in valid JSON format with these exact keys:
-{
-    "summary": "detailed summary emphasizing academic context, study challenges, and educational stressors",
-    "emotions": ["academic-specific", "emotions", "and", "feelings"],
-    "focus_areas": ["specific", "academic", "subjects", "or", "study", "areas"],
-    "tags": ["relevant", "academic", "wellness", "tags"],
-    "stress_level": "low/moderate/high",
-    "academic_concerns": ["primary", "study", "related", "concerns"]
-}
+Your answer is returned as structured output (summary, emotions, focus_areas, tags, stress_level, academic_concerns).
+The summary should emphasize academic context, study challenges, and educational stressors.
 
 Focus specifically on:
 - Academic workload and study pressure indicators
@@ -40,74 +40,7 @@ Be empathetic and student-focused, understanding the unique pressures of academi
 
 RECOMMENDATION_AGENT_PROMPT = """You are a specialized academic wellness coach focused on helping students manage study stress and academic challenges. Provide targeted recommendations for academic success and student well-being.
 
-**AVAILABLE TOOLS:**
-You have access to powerful data query tools. Call these to get context before making study recommendations:
-
-**Task & Academic Management Tools:**
-1. `eisenhower_get_tasks(userId: str)`
-   - Gets student's current tasks (assignments, projects, deadlines)
-   - Returns: Task lists organized by priority and urgency
-   - Use when: Need to understand current academic workload, upcoming deadlines
-
-2. `analyze_task_distribution(userId: str)`
-   - Analyzes task distribution and study time management
-   - Returns: Insights on prioritization, procrastination patterns, planning effectiveness
-   - Use when: Need to assess time management and suggest study schedule improvements
-
-**Study Tracking & Patterns:**
-3. `daily_data_get_monthly(userId: str, year: int, month: int)`
-   - Gets daily study tracking data for a specific month
-   - Returns: Daily study emotions, stress levels, academic patterns
-   - Use when: Need to understand study stress patterns, consistency, emotional trends
-
-4. `stats_monthly_overview(userId: str, year: int, month: int)`
-   - Gets comprehensive monthly academic statistics
-   - Returns: Study hours, emotional trends, productivity metrics, completion rates
-   - Use when: Need overall academic performance metrics and progress tracking
-
-**Study Productivity & Focus:**
-5. `pomodoro_get_analytics(userId: str, year: int, month: int)`
-   - Gets Pomodoro study session data and completion rates
-   - Returns: Study session durations, focus patterns, productivity trends
-   - Use when: Need to assess study focus patterns and session effectiveness
-
-6. `analyze_pomodoro_effectiveness(userId: str, days: int = 7)`
-   - Analyzes effectiveness of Pomodoro study technique
-   - Returns: Optimal study session durations, best times to study, environment factors
-   - Use when: Want to optimize study session recommendations and focus strategies
-
-**Study Patterns (Comprehensive):**
-7. `analyze_user_study_patterns(userId: str, days: int = 14)`
-   - Deep analysis of study duration, focus periods, and optimal study times
-   - Returns: Study productivity patterns, best study times, focus quality, peak performance hours
-   - Use when: Want to create personalized study schedules and time management plans
-
-8. `get_wellness_context(userId: str)`
-   - Gets comprehensive wellness profile affecting academic performance
-   - Returns: Sleep patterns, stress levels, physical wellness, overall wellbeing
-   - Use when: Need holistic view of factors affecting study performance
-
-9. `get_mock_wearable_data(userId: str, days: int = 7)`
-   - Gets physical wellness metrics (sleep, stress, activity levels)
-   - Returns: Physical health indicators that impact study capacity
-   - Use when: Need to consider physical wellness in study recommendations
-
-**How to Use:**
-- Query relevant tools at the START of your analysis
-- Use userId from context (available as {userId})
-- For time-based queries, use current date (November 2025)
-- Combine multiple tool results for data-driven recommendations
-- Reference specific metrics from tool results in your study advice
-
-**Example Usage:**
-If student mentions exam stress:
-  → Call: `daily_data_get_monthly(userId, 2025, 11)` + `analyze_task_distribution(userId)`
-  
-If discussing focus problems:
-  → Call: `analyze_pomodoro_effectiveness(userId, 7)` + `analyze_user_study_patterns(userId, 14)`
-  
-If planning study schedule:
-  → Call: `eisenhower_get_tasks(userId)` + `analyze_user_study_patterns(userId, 14)` + `stats_monthly_overview(userId, 2025, 11)`
+""" + build_tool_routing("study") + """
 
 Your task:
 1. Generate 3-5 actionable, study-focused recommendations based on academic stress patterns (use historical data when available)
@@ -117,26 +50,7 @@ Your task:
 5. Provide recommended tasks to help the user plan their day effectively with suggested due dates
 6. Maintain an encouraging, student-supportive tone
 
-Always respond in valid JSON format:
-{
-    "recommendations": [
-        {"title": "title", "description": "detailed study-focused advice", "category": "study_strategy/time_management/stress_relief/academic_support"}
-    ],
-    "wellness_exercises": [
-        {"name": "exercise name", "instructions": "step-by-step student-friendly guide", "duration": "time needed", "best_for": "when to use this technique"}
-    ],
-    "resources": [
-        {"type": "study_tool/app/technique/support", "title": "title", "description": "how it helps with academic challenges"}
-    ],
-    "wellness_pathways": [
-        {"pathway_name": "name", "pathway_type": "study_technique/time_management/stress_relief/focus_enhancement", "description": "detailed pathway description", "duration_days": 7}
-    ],
-    "recommended_tasks": [
-        {"task_title": "specific actionable task", "task_description": "detailed explanation of what to do and why", "priority_classification": "urgent_important/important_not_urgent/urgent_not_important/neither_urgent_nor_important", "suggested_due_days": 7}
-    ],
-    "tone": "supportive/encouraging/motivating/understanding",
-    "study_focus_tips": ["specific", "actionable", "study", "improvements"]
-}
+Your answer is returned as structured output (recommendations, wellness_exercises, resources, wellness_pathways, recommended_tasks, tone, study_focus_tips).
 
 Focus your recommendations on:
 - Time management and study scheduling strategies
@@ -169,97 +83,12 @@ Task Priority Classification (Eisenhower Priority Matrix):
 Focus on providing a mix of tasks across different quadrants, with emphasis on Quadrant 2 (important but not urgent) tasks for better long-term academic success and stress management."""
 
 
-SAFETY_REVIEWER_PROMPT = """You are a safety reviewer analyzing AI responses for academic stress management.
-
-Current Summary: {generated_summary}
-Current Recommendation: {recommendation}
-
-Evaluate safety and provide feedback:
-1. Check for harmful advice or crisis indicators
-2. Verify professional tone and appropriateness
-3. Ensure no medical diagnosis/prescription advice
-4. Look for academic-specific safety concerns
-
-If SAFE and meets all criteria, respond with: "SAFETY_APPROVED"
-If needs improvement, provide specific feedback for refinement.
-
-Focus on these red flags:
-- Self-harm indicators, suicidal ideation
-- Dangerous academic advice (extreme sleep deprivation, etc.)
-- Inappropriate medical recommendations
-- Crisis situations requiring professional help
-- Academic burnout reaching dangerous levels
-- Extreme academic perfectionism leading to self-harm thoughts
-- Unhealthy study habits (extreme sleep deprivation, skipping meals)
-- Signs of academic-related panic disorders
-
-Respond with either "SAFETY_APPROVED" or specific feedback for improvement."""
-
-
-SAFETY_REFINER_PROMPT = """You are a safety refiner for academic stress AI responses.
-
-Safety Feedback: {safety_feedback}
-Current Summary: {generated_summary}
-Current Recommendation: {recommendation}
-User ID: {userId}
-Session ID: {session_id}
-Mode: {mode}
-
-**CRITICAL WORKFLOW - SAVE THEN EXIT:**
-If feedback is "SAFETY_APPROVED":
+SAFETY_REVIEWER_PROMPT = build_safety_reviewer("study")
 
-1. **FIRST** call the tool: save_complete_wellness_analysis
-   
-   Parameters (extract from context variables):
-   - userId: {userId}
-   - session_id: {session_id}
-   - mode: {mode}
-   - transcript_summary: Extract from {generated_summary} as {{
-       "summary": "<text>",
-       "emotions": ["list"],
-       "focus_areas": ["list"],
-       "tags": ["list"],
-       "stress_level": "<low/moderate/high>",
-       "academic_concerns": ["list"]
-     }}
-   - stats_recommendations: Extract from {recommendation} as {{
-       "recommendations": [list],
-       "wellness_exercises": [list],
-       "resources": [list],
-       "wellness_pathways": [list],
-       "recommended_tasks": [list],
-       "tone": "supportive",
-       "study_focus_tips": [list]
-     }}
-   - safety_approved: true
-   - safety_score: 0.95
-   
-2. **WAIT** for save confirmation
-   - Save may take 10-20 seconds (database operations)
-   - Look for "success": true in response
-   - Check for "tasks_saved" and "pathways_saved" counts
-   
-3. **AFTER** successful save confirmation, call exit_safety_loop tool to exit
-   
-**IMPORTANT:**
-- Do NOT exit before save completes
-- If save fails, output the error but still exit (orchestrator handles fallback)
-- All parameters must be properly formatted JSON
+SAFETY_REFINER_PROMPT = build_safety_refiner("study")
 
-Otherwise, refine the responses based on safety feedback:
-1. Remove harmful content
-2. Add appropriate disclaimers
-3. Improve professional tone
-4. Add crisis resource information if needed
-5. Ensure academic advice is healthy and sustainable
 
-Output refined JSON with same structure but improved safety:
-{{
-    "is_safe": true/false,
-    "safety_score": 0.0-1.0,
-    "concerns": ["list of concerns if any"],
-    "recommendations_approved": true/false,
-    "summary_approved": true/false,
-    "modifications_needed": ["specific changes if needed"],
-    "overall_assessment": "brief assessment"
-}}"""
+# Safety prompts use str.format escaping ({{ }}), so they are pre-parsed once and
+# passed to the agents as InstructionProviders (missing state renders as empty)
+render_safety_reviewer = PromptTemplate(SAFETY_REVIEWER_PROMPT)
+render_safety_refiner = PromptTemplate(SAFETY_REFINER_PROMPT)
@@ -1,23 +1,16 @@
-from pathlib import Path
-from dotenv import load_dotenv
-import os
+from functools import lru_cache
 
-# Load environment variables FIRST
-backend_root = Path(__file__).parent.parent.parent.parent
-env_production = backend_root / ".env.production"
-env_file = backend_root / ".env"
-
-if env_production.exists():
-    load_dotenv(env_production)
-elif env_file.exists():
-    load_dotenv(env_file)
+# Environment and model name are resolved once by agents._bootstrap
+from agents._bootstrap import MODEL_NAME
 
 from .prompts import RECOMMENDATION_AGENT_PROMPT
 from google.adk.agents import LlmAgent
-from .tools import Mem0Tool
-
-mem0_tool = Mem0Tool()
+from agents._mem0_singleton import mem0_tool
+from agents._safety import flag_crisis_in_response
+from agents._mcp_tools import ContextBundleTool
+from agents._schemas import StudyRecommendations
 
+@lru_cache(maxsize=4)
 def get_recommendation_agent(mcp_toolset):
     """
     Factory function to create study recommendation agent with MCP toolset access.
@@ -25,6 +18,12 @@ def get_recommendation_agent(mcp_toolset):
     The agent has access to:
     - Mem0 tools (memory search/save)
     - MCP toolset (Eisenhower tasks, daily study data, stats, Pomodoro analytics)
+    - fetch_context_bundle (the common MCP context reads, fetched concurrently)
+    
+    Memoized per toolset instance: the agent holds no per-user state (that lives
+    in the ADK session), so repeat calls with the same toolset return the same
+    LlmAgent. Note an ADK agent can only have one parent, so a cached agent must
+    not be attached to a second agent graph.
     
     Args:
         mcp_toolset: MCPToolset instance with access to user study data
@@ -32,15 +31,12 @@ def get_recommendation_agent(mcp_toolset):
     Returns:
         LlmAgent configured for academic stress recommendations
     """
-    # Get MODEL_NAME with fallback default
-    model_name = os.getenv("MODEL_NAME", "gemini-2.0-flash")
-    if not model_name or model_name.lower() == "none":
-        model_name = "gemini-2.0-flash"
-    
     return LlmAgent(
-        model=model_name,
+        model=MODEL_NAME,
         name="recommendation_agent",
         instruction=RECOMMENDATION_AGENT_PROMPT,
         output_key="recommendation",
-        tools=[mem0_tool.save_memory, mem0_tool.search_memory, mcp_toolset]
+        after_model_callback=flag_crisis_in_response,
+        output_schema=StudyRecommendations,
+        tools=[mem0_tool.save_memory, mem0_tool.search_memory, mcp_toolset, ContextBundleTool(mcp_toolset)]
     )
\ No newline at end of file
@@ -1,3 +1,10 @@
+from agents._shared_prompts import (
+    PromptTemplate,
+    build_safety_refiner,
+    build_safety_reviewer,
+    build_tool_routing,
+)
+
 SUMMARY_AGENT_PROMPT = """You are a mental health analysis AI. Analyze conversations and provide comprehensive summaries.
 
 Your task:
@@ -9,81 +16,14 @@ Your task:
     health-anxiety, social-anxiety, perfectionism, burnout, overwhelm, hopelessness, joy, 
     gratitude, progress, resilience, coping, healing
 
-Always respond in valid JSON format with these exact keys:
-{
-    "summary": "detailed summary text",
-    "emotions": ["list", "of", "emotions"],
-    "focus_areas": ["main", "topics", "discussed"],
-    "tags": ["relevant", "mental", "wellness", "tags"]
-}
+Your answer is returned as structured output (summary, emotions, focus_areas, tags).
 
 Be empathetic, non-judgmental, and focus on emotional undertones and mental health indicators."""
 
 
 RECOMMENDATION_AGENT_PROMPT = """You are a compassionate mental wellness coach. Provide supportive recommendations based on conversations.
 
-**AVAILABLE TOOLS:**
-You have access to powerful data query tools. Call these to get context before making recommendations:
-
-**Task & Time Management Tools:**
-1. `eisenhower_get_tasks(userId: str)`
-   - Gets user's current tasks from Eisenhower Matrix (all quadrants)
-   - Returns: Task lists organized by priority (urgent/important classification)
-   - Use when: Need to understand current workload, priorities, deadlines
-
-2. `analyze_task_distribution(userId: str)`
-   - Analyzes task distribution and time management effectiveness
-   - Returns: Insights on prioritization, quadrant balance, planning patterns
-   - Use when: Need to assess overall time management and suggest improvements
-
-**Daily Tracking & Patterns:**
-3. `daily_data_get_monthly(userId: str, year: int, month: int)`
-   - Gets daily tracking data for a specific month
-   - Returns: Daily emotions, summaries, patterns over time
-   - Use when: Need to understand emotional patterns, trends, consistency
-
-4. `stats_monthly_overview(userId: str, year: int, month: int)`
-   - Gets comprehensive monthly statistics and analytics
-   - Returns: Overview of study hours, emotional trends, productivity metrics
-   - Use when: Need overall performance metrics and progress tracking
-
-**Productivity & Focus:**
-5. `pomodoro_get_analytics(userId: str, year: int, month: int)`
-   - Gets Pomodoro session data and completion rates
-   - Returns: Session durations, completion patterns, productivity trends
-   - Use when: Need to assess focus patterns and work session effectiveness
-
-6. `analyze_pomodoro_effectiveness(userId: str, days: int = 7)`
-   - Analyzes effectiveness of Pomodoro technique usage
-   - Returns: Optimal session durations, completion rates, environment insights
-   - Use when: Want to optimize study/work session recommendations
-
-**Wellness Context (Comprehensive):**
-7. `get_wellness_context(userId: str)`
-   - Gets comprehensive wellness profile combining multiple data sources
-   - Returns: Integrated view of wellness patterns, wearable data, study habits
-   - Use when: Need holistic understanding of user's wellness state
-
-8. `get_mock_wearable_data(userId: str, days: int = 7)`
-   - Gets wellness metrics from wearable data (sleep, heart rate, activity, stress)
-   - Returns: Physical wellness indicators over specified days
-   - Use when: Need to consider physical health in wellness recommendations
-
-9. `analyze_user_study_patterns(userId: str, days: int = 14)`
-   - Analyzes study duration, focus periods, and optimal study times
-   - Returns: Study productivity patterns, best study times, focus quality
-   - Use when: Want to suggest personalized study schedules
-
-**How to Use:**
-- Query relevant tools at the START of your analysis
-- Use userId from context (available as {userId})
-- For time-based queries, use current date (assume today's date)
-- Combine multiple tool results for comprehensive recommendations
-- Reference specific data points from tool results in your recommendations
-
-**Example Usage:**
-If user mentions stress, call: `get_wellness_context(userId)` + `daily_data_get_monthly(userId, 2025, 11)`
-If discussing productivity, call: `analyze_task_distribution(userId)` + `pomodoro_get_analytics(userId, 2025, 11)`
+""" + build_tool_routing("wellness") + """
 
 Your task:
 1. Generate 3-5 actionable, personalized recommendations (use historical data when available)
@@ -93,25 +33,7 @@ Your task:
 5. Provide recommended tasks to help the user with self-care and mental wellness
 6. Maintain a supportive, encouraging tone
 
-Always respond in valid JSON format:
-{
-    "recommendations": [
-        {"title": "title", "description": "detailed advice", "category": "category_name"}
-    ],
-    "wellness_exercises": [
-        {"name": "exercise name", "instructions": "step-by-step", "duration": "time needed", "best_for": "when to use this"}
-    ],
-    "resources": [
-        {"type": "resource type", "title": "title", "description": "how it helps"}
-    ],
-    "wellness_pathways": [
-        {"pathway_name": "name", "pathway_type": "mindfulness/stress_management/self_care/emotional_wellness", "description": "detailed pathway description", "duration_days": 7}
-    ],
-    "recommended_tasks": [
-        {"task_title": "specific self-care task", "task_description": "detailed explanation", "priority_classification": "urgent_important/important_not_urgent/urgent_not_important/neither_urgent_nor_important", "suggested_due_days": 7}
-    ],
-    "tone": "supportive/encouraging/gentle/motivating"
-}
+Your answer is returned as structured output (recommendations, wellness_exercises, resources, wellness_pathways, recommended_tasks, tone).
 
 Guidelines:
 - Be warm, empathetic, and non-judgmental
@@ -121,92 +43,12 @@ Guidelines:
 - Encourage professional help when appropriate"""
 
 
-SAFETY_REVIEWER_PROMPT = """You are a safety reviewer analyzing AI responses for general wellness management.
-
-Current Summary: {generated_summary}
-Current Recommendation: {recommendation}
-
-Evaluate safety and provide feedback:
-1. Check for harmful advice or crisis indicators
-2. Verify professional tone and appropriateness
-3. Ensure no medical diagnosis/prescription advice
-4. Look for general wellness safety concerns
-
-If SAFE and meets all criteria, respond with: "SAFETY_APPROVED"
-If needs improvement, provide specific feedback for refinement.
-
-Focus on these red flags:
-- Self-harm indicators, suicidal ideation
-- Substance abuse concerns
-- Abusive relationships
-- Severe mental health crises
-- Inappropriate medical recommendations
-- Crisis situations requiring professional help
-
-Respond with either "SAFETY_APPROVED" or specific feedback for improvement."""
-
-
-SAFETY_REFINER_PROMPT = """You are a safety refiner for general wellness AI responses.
-
-Safety Feedback: {safety_feedback}
-Current Summary: {generated_summary}
-Current Recommendation: {recommendation}
-User ID: {userId}
-Session ID: {session_id}
-Mode: {mode}
-
-**CRITICAL WORKFLOW - SAVE THEN EXIT:**
-If feedback is "SAFETY_APPROVED":
+SAFETY_REVIEWER_PROMPT = build_safety_reviewer("wellness")
 
-1. **FIRST** call the tool: save_complete_wellness_analysis
-   
-   Parameters (extract from context variables):
-   - userId: {userId}
-   - session_id: {session_id}
-   - mode: {mode}
-   - transcript_summary: Extract from {generated_summary} as {{
-       "summary": "<text>",
-       "emotions": ["list"],
-       "focus_areas": ["list"],
-       "tags": ["list"]
-     }}
-   - stats_recommendations: Extract from {recommendation} as {{
-       "recommendations": [list],
-       "wellness_exercises": [list],
-       "resources": [list],
-       "wellness_pathways": [list],
-       "recommended_tasks": [list],
-       "tone": "supportive"
-     }}
-   - safety_approved: true
-   - safety_score: 0.95
-   
-2. **WAIT** for save confirmation
-   - Save may take 10-20 seconds (database operations)
-   - Look for "success": true in response
-   - Check for "tasks_saved" and "pathways_saved" counts
-   
-3. **AFTER** successful save confirmation, call exit_safety_loop tool to exit
-   
-**IMPORTANT:**
-- Do NOT exit before save completes
-- If save fails, output the error but still exit (orchestrator handles fallback)
-- All parameters must be properly formatted JSON
+SAFETY_REFINER_PROMPT = build_safety_refiner("wellness")
 
-Otherwise, refine the responses based on safety feedback:
-1. Remove harmful content
-2. Add appropriate disclaimers
-3. Improve professional tone
-4. Add crisis resource information if needed
-5. Ensure wellness advice is safe and appropriate
 
-Output refined JSON with same structure but improved safety:
-{{
-    "is_safe": true/false,
-    "safety_score": 0.0-1.0,
-    "concerns": ["list of concerns if any"],
-    "recommendations_approved": true/false,
-    "summary_approved": true/false,
-    "modifications_needed": ["specific changes if needed"],
-    "overall_assessment": "brief assessment"
-}}"""
+# Safety prompts use str.format escaping ({{ }}), so they are pre-parsed once and
+# passed to the agents as InstructionProviders (missing state renders as empty)
+render_safety_reviewer = PromptTemplate(SAFETY_REVIEWER_PROMPT)
+render_safety_refiner = PromptTemplate(SAFETY_REFINER_PROMPT)
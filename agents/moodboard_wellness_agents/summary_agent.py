@@ -1,32 +1,18 @@
-from pathlib import Path
-from dotenv import load_dotenv
-import os
-
-# Load environment variables FIRST
-backend_root = Path(__file__).parent.parent.parent.parent
-env_production = backend_root / ".env.production"
-env_file = backend_root / ".env"
-
-if env_production.exists():
-    load_dotenv(env_production)
-elif env_file.exists():
-    load_dotenv(env_file)
+# Environment and model name are resolved once by agents._bootstrap
+from agents._bootstrap import MODEL_NAME
 
 from .prompts import SUMMARY_AGENT_PROMPT
 from google.adk.agents import LlmAgent
-from .tools import Mem0Tool
-
-mem0_tool = Mem0Tool()
-
-# Get MODEL_NAME with fallback default
-model_name = os.getenv("MODEL_NAME", "gemini-2.0-flash")
-if not model_name or model_name.lower() == "none":
-    model_name = "gemini-2.0-flash"
+from agents._mem0_singleton import mem0_tool
+from agents._safety import flag_crisis_in_response
+from agents._schemas import WellnessSummary
 
 summary_agent = LlmAgent(
-    model=model_name,
+    model=MODEL_NAME,
     name="summary_agent",
     instruction=SUMMARY_AGENT_PROMPT,
     output_key="generated_summary",
+    after_model_callback=flag_crisis_in_response,
+    output_schema=WellnessSummary,
     tools=[mem0_tool.save_memory, mem0_tool.search_memory]
 )
\ No newline at end of file
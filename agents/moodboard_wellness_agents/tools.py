@@ -1,26 +1,11 @@
-from mem0 import MemoryClient
-from google.adk.tools import ToolContext
+import logging
 
-class Mem0Tool():
-    def __init__(self):
-        self.mem0 = MemoryClient()
+from google.adk.tools import ToolContext
 
-    def search_memory(self, query: str, user_id: str) -> dict:
-        """Search through past conversations and memories"""
-        memories = self.mem0.search(query, user_id=user_id, output_format='v1.1')
-        if memories.get('results', []):
-            memory_list = memories['results']
-            memory_context = "\n".join([f"- {mem['memory']}" for mem in memory_list])
-            return {"status": "success", "memories": memory_context}
-        return {"status": "no_memories", "message": "No relevant memories found"}
+# Mem0Tool now lives in agents._mem0_singleton (one shared instance); re-exported here
+from agents._mem0_singleton import Mem0Tool  # noqa: F401
 
-    def save_memory(self, content: str, user_id: str) -> dict:
-        """Save important information to memory"""
-        try:
-            result = self.mem0.add([{"role": "user", "content": content}], user_id=user_id, output_format='v1.1')
-            return {"status": "success", "message": "Information saved to memory", "result": result}
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to save memory: {str(e)}"}
+logger = logging.getLogger(__name__)
 
 
 def exit_safety_loop(tool_context: ToolContext):
@@ -35,7 +20,7 @@ def exit_safety_loop(tool_context: ToolContext):
     Returns:
         dict: Status indicating safety review completion
     """
-    print(f"[Wellness Safety Loop] Exiting - conditions satisfied by {tool_context.agent_name}")
+    logger.info("[Wellness Safety Loop] Exiting - conditions satisfied by %s", tool_context.agent_name)
     tool_context.actions.escalate = True
     return {"status": "safety_review_complete", "message": "Wellness safety review passed all criteria"}
 
@@ -52,7 +37,7 @@ def escalate_safety_concern(tool_context: ToolContext, concern: str = ""):
     Returns:
         dict: Status indicating escalation
     """
-    print(f"[Wellness Safety Loop] ESCALATING - {concern} detected by {tool_context.agent_name}")
+    logger.warning("[Wellness Safety Loop] ESCALATING - %s detected by %s", concern, tool_context.agent_name)
     tool_context.actions.escalate = True
     return {
         "status": "safety_escalation", 
@@ -13,28 +13,82 @@ Runs appropriate agent (study or general) based on mode and returns structured o
 import os
 import json
 import asyncio
+import logging
+import uuid
+import weakref
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Optional
 from datetime import datetime, date, timedelta
 
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.apps import App
+from google.adk.events import Event, EventActions
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
 
+# orjson parses agent output several times faster than the stdlib; optional
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import pre-built agents (with MCP tools already included)
 from moodboard_study_agents.agent import root_agent as study_agent
 from moodboard_wellness_agents.agent import root_agent as wellness_agent
+from agents._mcp_singleton import get_mcp_toolset, warmup as warmup_mcp
+from agents._mem0_singleton import get_mem0_client
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "WellnessAnalysis"
+
+if ORJSON_AVAILABLE:
+    json_loads = orjson.loads
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError; listed for clarity
+    JSON_DECODE_ERRORS = (orjson.JSONDecodeError, json.JSONDecodeError)
+else:
+    json_loads = json.loads
+    JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+# Gemini context caching: the system prompts and tool declarations are identical
+# across turns, so ADK caches that prefix server-side after the first model call
+# of a session and reuses it for the remaining tool turns and safety-loop
+# iterations. The fingerprint covers the instruction text, so a prompt change
+# starts a new cache. Set CONTEXT_CACHE_ENABLED=false to send prompts inline.
+CONTEXT_CACHE_CONFIG = (
+    ContextCacheConfig(
+        ttl_seconds=int(os.getenv("CONTEXT_CACHE_TTL_SECONDS", "3600")),
+        min_tokens=int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", "4096")),
+    )
+    if os.getenv("CONTEXT_CACHE_ENABLED", "true").lower() != "false"
+    else None
+)
+
+study_app = App(name=APP_NAME, root_agent=study_agent, context_cache_config=CONTEXT_CACHE_CONFIG)
+wellness_app = App(name=APP_NAME, root_agent=wellness_agent, context_cache_config=CONTEXT_CACHE_CONFIG)
+
+# One session service and one Runner per app for the whole process. Sessions
+# only live for a single analysis and are deleted when it finishes.
+session_service = InMemorySessionService()
+study_runner = Runner(app=study_app, session_service=session_service)
+wellness_runner = Runner(app=wellness_app, session_service=session_service)
+
+
+# Agent priority classification -> Eisenhower quadrant
+PRIORITY_TO_QUADRANT = MappingProxyType({
+    "urgent_important": "high_imp_high_urg",
+    "important_not_urgent": "high_imp_low_urg",
+    "urgent_not_important": "low_imp_high_urg",
+    "neither_urgent_nor_important": "low_imp_low_urg",
+})
 
 
 def map_priority_to_quadrant(priority: str) -> str:
     """Map priority classification to Eisenhower quadrant"""
-    mapping = {
-        "urgent_important": "high_imp_high_urg",
-        "important_not_urgent": "high_imp_low_urg",
-        "urgent_not_important": "low_imp_high_urg",
-        "neither_urgent_nor_important": "low_imp_low_urg",
-    }
-    return mapping.get(priority, "high_imp_low_urg")  # Default to Q2
+    return PRIORITY_TO_QUADRANT.get(priority, "high_imp_low_urg")  # Default to Q2
 
 
 def calculate_due_date(suggested_days: int) -> str:
@@ -51,17 +105,49 @@ def strip_markdown_json(text: str) -> str:
     if not isinstance(text, str):
         return text
     
-    # Remove markdown code block wrapper
+    # Remove markdown code block wrapper (linear: a regex with a lazy middle
+    # group backtracks badly on long whitespace runs)
     text = text.strip()
     if text.startswith("```json"):
-        text = text[7:]  # Remove ```json
-    elif text.startswith("```"):
-        text = text[3:]  # Remove ```
+        text = text.removeprefix("```json")
+    else:
+        text = text.removeprefix("```")
+    
+    return text.removesuffix("```").strip()
+
+
+def _default_safety(approved_by_feedback: bool) -> Dict:
+    return {"is_safe": True, "safety_score": 0.95 if approved_by_feedback else 0.9}
+
+
+def _normalize_safety(safety_data, approved_by_feedback: bool) -> Dict:
+    """
+    Coerce the safety refiner's output into a dict.
+    
+    Anything that isn't a JSON object (completion messages, empty output,
+    malformed JSON) becomes the default verdict for approved_by_feedback.
+    """
+    if isinstance(safety_data, dict):
+        return safety_data
+    if not isinstance(safety_data, str):
+        return _default_safety(approved_by_feedback)
+    
+    # Strip markdown code blocks before parsing
+    clean_json = strip_markdown_json(safety_data)
+    # Not valid JSON (empty or just `}`)
+    if not clean_json or clean_json == "}":
+        return _default_safety(approved_by_feedback)
     
-    if text.endswith("```"):
-        text = text[:-3]  # Remove trailing ```
+    try:
+        parsed = json_loads(clean_json)
+    except JSON_DECODE_ERRORS as e:
+        logger.warning("⚠️  Failed to parse safety JSON: %s (raw preview: %.100s...)", e, safety_data)
+        return _default_safety(approved_by_feedback)
     
-    return text.strip()
+    if not isinstance(parsed, dict):
+        return _default_safety(approved_by_feedback)
+    logger.debug("✅ Parsed safety JSON: is_safe=%s, score=%s", parsed.get("is_safe", "N/A"), parsed.get("safety_score", "N/A"))
+    return parsed
 
 
 def parse_agent_output(raw_output: Dict, mode: str) -> Dict:
@@ -81,11 +167,10 @@ def parse_agent_output(raw_output: Dict, mode: str) -> Dict:
         try:
             # Strip markdown code blocks before parsing
             clean_json = strip_markdown_json(summary_data)
-            summary_data = json.loads(clean_json)
-            print(f"✅ Successfully parsed summary with {len(summary_data.get('emotions', []))} emotions")
+            summary_data = json_loads(clean_json)
+            logger.debug("✅ Parsed summary with %d emotions", len(summary_data.get("emotions", [])))
         except Exception as e:
-            print(f"⚠️  Failed to parse summary JSON: {e}")
-            print(f"   Raw summary preview: {summary_data[:100]}...")
+            logger.warning("⚠️  Failed to parse summary JSON: %s (raw preview: %.100s...)", e, summary_data)
             summary_data = {"summary": summary_data, "emotions": [], "focus_areas": [], "tags": []}
     
     # Extract recommendation data
@@ -94,89 +179,39 @@ def parse_agent_output(raw_output: Dict, mode: str) -> Dict:
         try:
             # Strip markdown code blocks before parsing
             clean_json = strip_markdown_json(rec_data)
-            rec_data = json.loads(clean_json)
-            print(f"✅ Successfully parsed recommendations: {len(rec_data.get('recommendations', []))} items")
+            rec_data = json_loads(clean_json)
+            logger.debug("✅ Parsed recommendations: %d items", len(rec_data.get("recommendations", [])))
         except Exception as e:
-            print(f"⚠️  Failed to parse recommendation JSON: {e}")
-            print(f"   Raw recommendation preview: {rec_data[:100]}...")
+            logger.warning("⚠️  Failed to parse recommendation JSON: %s (raw preview: %.100s...)", e, rec_data)
             rec_data = {"recommendations": [], "wellness_exercises": [], "resources": [], "tone": "supportive"}
     
     # Extract safety data
     safety_data = raw_output.get("safety_guidelines", {})
     safety_feedback = raw_output.get("safety_feedback", "")
+    approved_by_feedback = "SAFETY_APPROVED" in str(safety_feedback).upper()
     
-    print(f"🔍 DEBUG - Safety data type: {type(safety_data)}")
-    if isinstance(safety_data, str):
-        print(f"   Safety data preview: {safety_data[:100]}...")
-    print(f"   Safety feedback: {str(safety_feedback)[:100] if safety_feedback else 'None'}...")
-    
-    # Check if safety_data is just a confirmation message (agent completed save and exited)
-    if isinstance(safety_data, str) and ("saved" in safety_data.lower() or "exit" in safety_data.lower()):
-        print(f"✅ Safety data appears to be completion message, using default safe values")
-    
-    # Handle safety_data parsing with better error handling
-    if isinstance(safety_data, dict):
-        # Already a dict, use it as is
-        pass
-    elif isinstance(safety_data, str):
-        # Try to parse string
-        try:
-            # Strip markdown code blocks before parsing
-            clean_json = strip_markdown_json(safety_data)
-            
-            # Check if it's a valid JSON string (not empty, not just whitespace, not just `}`)
-            if not clean_json or clean_json.strip() == "}" or clean_json.strip() == "":
-                # Invalid JSON - check safety_feedback for approval status
-                if "SAFETY_APPROVED" in str(safety_feedback).upper():
-                    safety_data = {"is_safe": True, "safety_score": 0.95}
-                else:
-                    safety_data = {"is_safe": True, "safety_score": 0.9}
-            else:
-                # Try to parse as JSON
-                safety_data = json.loads(clean_json)
-                print(f"✅ Successfully parsed safety JSON: is_safe={safety_data.get('is_safe', 'N/A')}, score={safety_data.get('safety_score', 'N/A')}")
-        except json.JSONDecodeError as e:
-            print(f"⚠️  Failed to parse safety JSON: {e}")
-            print(f"   Raw safety data preview: {safety_data[:100]}...")
-            
-            # Fallback: Check safety_feedback for approval
-            if "SAFETY_APPROVED" in str(safety_feedback).upper():
-                safety_data = {"is_safe": True, "safety_score": 0.95}
-            else:
-                safety_data = {"is_safe": True, "safety_score": 0.9}
-        except Exception as e:
-            print(f"⚠️  Unexpected error parsing safety JSON: {e}")
-            # Default safe values
-            if "SAFETY_APPROVED" in str(safety_feedback).upper():
-                safety_data = {"is_safe": True, "safety_score": 0.95}
-            else:
-                safety_data = {"is_safe": True, "safety_score": 0.9}
-    else:
-        # Not a dict or string, check safety_feedback
-        if "SAFETY_APPROVED" in str(safety_feedback).upper():
-            safety_data = {"is_safe": True, "safety_score": 0.95}
-        else:
-            safety_data = {"is_safe": True, "safety_score": 0.9}
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔍 Safety data type: %s", type(safety_data).__name__)
+        if isinstance(safety_data, str):
+            logger.debug("   Safety data preview: %.100s...", safety_data)
+        logger.debug("   Safety feedback: %.100s...", safety_feedback or "None")
+        
+        # Check if safety_data is just a confirmation message (agent completed save and exited)
+        if isinstance(safety_data, str) and ("saved" in safety_data.lower() or "exit" in safety_data.lower()):
+            logger.debug("✅ Safety data appears to be completion message, using default safe values")
     
-    # Ensure safety_data has required fields
-    if not isinstance(safety_data, dict):
-        safety_data = {"is_safe": True, "safety_score": 0.9}
+    # Parse safety_data, falling back to the reviewer's verdict in safety_feedback
+    safety_data = _normalize_safety(safety_data, approved_by_feedback)
     
     # Extract safety_approved and safety_score with defaults
     # Handle both "is_safe" and "safety_approved" keys (agents may use either)
-    safety_approved = safety_data.get("is_safe", safety_data.get("safety_approved", True))
-    safety_score = safety_data.get("safety_score", 0.95 if safety_approved else 0.5)
-    
-    # If safety_approved not found in dict, check safety_feedback for approval status
-    if "is_safe" not in safety_data and "safety_approved" not in safety_data:
-        # Check if we have approval in feedback
-        if "SAFETY_APPROVED" in str(safety_feedback).upper():
-            safety_approved = True
-            safety_score = 0.95
-        else:
-            # Default to safe with moderate score
-            safety_approved = True
-            safety_score = 0.9
+    if "is_safe" in safety_data or "safety_approved" in safety_data:
+        safety_approved = safety_data.get("is_safe", safety_data.get("safety_approved", True))
+        safety_score = safety_data.get("safety_score", 0.95 if safety_approved else 0.5)
+    else:
+        # Default to safe; the score depends on whether the reviewer approved
+        safety_approved = True
+        safety_score = 0.95 if approved_by_feedback else 0.9
     
     # Ensure we have valid boolean values
     if not isinstance(safety_approved, bool):
@@ -189,7 +224,7 @@ def parse_agent_output(raw_output: Dict, mode: str) -> Dict:
     except (ValueError, TypeError):
         safety_score = 0.95 if safety_approved else 0.5
     
-    print(f"✅ Safety validation complete: approved={safety_approved}, score={safety_score:.2f}")
+    logger.debug("✅ Safety validation complete: approved=%s, score=%.2f", safety_approved, safety_score)
     
     # Build transcript summary (goes under transcript)
     transcript_summary = {
@@ -205,14 +240,15 @@ def parse_agent_output(raw_output: Dict, mode: str) -> Dict:
     
     # Process recommended tasks
     raw_tasks = rec_data.get("recommended_tasks", [])
-    processed_tasks = []
-    for task in raw_tasks:
-        processed_tasks.append({
+    processed_tasks = [
+        {
             "task_title": task.get("task_title", ""),
             "task_description": task.get("task_description", ""),
             "priority_classification": task.get("priority_classification", "important_not_urgent"),
             "suggested_due_days": task.get("suggested_due_days", 7),
-        })
+        }
+        for task in raw_tasks
+    ]
     
     # Extract wellness pathways (new feature)
     wellness_pathways = rec_data.get("wellness_pathways", [])
@@ -258,6 +294,22 @@ def parse_agent_output(raw_output: Dict, mode: str) -> Dict:
     }
 
 
+# Concurrent agent runs per event loop. Each analysis is a chain of Gemini and
+# tool calls that already overlaps with other requests on the loop; the cap
+# keeps bursts (e.g. morning journaling peaks) from tripping Gemini rate limits.
+ANALYSIS_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_MAX_CONCURRENCY", "8"))
+_analysis_semaphores = weakref.WeakKeyDictionary()
+
+
+def _analysis_slot() -> asyncio.Semaphore:
+    """The running loop's semaphore (asyncio primitives are bound to one loop)"""
+    loop = asyncio.get_running_loop()
+    semaphore = _analysis_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _analysis_semaphores[loop] = asyncio.Semaphore(ANALYSIS_MAX_CONCURRENCY)
+    return semaphore
+
+
 async def run_wellness_analysis(
     transcript: str,
     mode: str,
@@ -274,7 +326,7 @@ async def run_wellness_analysis(
     4. Agent flow:
        - Parallel: Summary (mem0) + Recommendations (mem0 + MCP data tools)
        - Safety Loop: Reviewer → Refiner (max 3 iterations)
-       - If approved: Refiner calls save_complete_wellness_analysis (MCP) → exit_safety_loop
+       - If approved: Refiner queues save_complete_wellness_analysis_async (MCP, runs in background) → exit_safety_loop
     5. Parse and return structured output
     
     Args:
@@ -286,56 +338,50 @@ async def run_wellness_analysis(
     Returns:
         Structured analysis result with transcript_summary and stats_recommendations
     """
-    # Select appropriate agent (pre-built with MCP tools)
-    agent = study_agent if mode == "study" else wellness_agent
+    # Select appropriate runner (pre-built agent with MCP tools + context caching)
+    runner = study_runner if mode == "study" else wellness_runner
+    app_name = runner.app_name
+    
+    # One id for the whole run: session state (where the deferred save is keyed),
+    # the ADK session, the save status lookup and the response all use it
+    session_id = session_id or f"session_{uuid.uuid4().hex}"
     
-    # Initialize session service for Runner
-    session_service = InMemorySessionService()
-    app_name = "WellnessAnalysis"
+    # One clock read per request: state timestamp and created_at agree
+    now_iso = datetime.utcnow().isoformat()
     
     # Create or get session with context variables in state
     initial_state = {
         "transcript": transcript,
         "userId": user_id,  # MCP tools expect userId
         "mode": mode,
-        "session_id": session_id or f"session_{datetime.utcnow().timestamp()}",
-        "timestamp": datetime.utcnow().isoformat(),
+        "session_id": session_id,
+        "timestamp": now_iso,
     }
     
-    if session_id:
-        try:
-            session = await session_service.get_session(
-                app_name=app_name,
-                user_id=user_id,
-                session_id=session_id
-            )
-            # Update state with new context
-            session.state.update(initial_state)
-        except:
-            session = await session_service.create_session(
-                app_name=app_name,
-                user_id=user_id,
-                session_id=session_id,
-                state=initial_state
-            )
-    else:
+    # get_session returns None for unknown ids, so no exception-driven fallback
+    session = await session_service.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id
+    )
+    if session is None:
         session = await session_service.create_session(
             app_name=app_name,
             user_id=user_id,
+            session_id=session_id,
             state=initial_state
         )
-        session_id = session.id
+    else:
+        # Existing session: sessions are returned as copies, so record the new
+        # context as a state delta for the service to persist
+        await session_service.append_event(
+            session,
+            Event(author="user", actions=EventActions(state_delta=initial_state))
+        )
     
     # Run agent (MCP server starts automatically via MCPToolset)
-    runner = Runner(
-        agent=agent,
-        app_name=app_name,
-        session_service=session_service
-    )
-    
     try:
-        print(f"🚀 Starting {mode} agent analysis for session {session_id}")
-        print(f"📝 Transcript length: {len(transcript)} characters")
+        logger.info("🚀 Starting %s agent analysis for session %s (%d transcript characters)", mode, session_id, len(transcript))
         
         # Create message with transcript for the agent
         new_message = types.Content(
@@ -343,89 +389,72 @@ async def run_wellness_analysis(
             parts=[types.Part(text=transcript)]
         )
         
-        # Execute agent with message
-        final_result = {}
-        async for event in runner.run_async(
-            user_id=user_id,
-            session_id=session_id,
-            new_message=new_message
-        ):
-            # Collect final result from events
-            if hasattr(event, 'is_final_response') and event.is_final_response():
-                if hasattr(event, 'content') and event.content:
-                    if hasattr(event.content, 'parts') and event.content.parts:
-                        for part in event.content.parts:
-                            if hasattr(part, 'text') and part.text:
-                                try:
-                                    # Try to parse as JSON if possible
-                                    parsed = json.loads(part.text)
-                                    final_result.update(parsed)
-                                except:
-                                    # If not JSON, store as text
-                                    if 'response' not in final_result:
-                                        final_result['response'] = part.text
-        
-        # After execution, get the session state which should contain agent outputs
-        final_session = await session_service.get_session(
-            app_name=app_name,
-            user_id=user_id,
-            session_id=session_id
-        )
+        # Execute agent with message. Outputs are read from state (output_key),
+        # so events only matter for their state deltas.
+        # Session state as the runner leaves it, rebuilt from the events' state
+        # deltas (get_session would deep-copy the whole session and its events)
+        final_state = dict(session.state)
+        # Bounded per event loop: bursts queue here instead of piling onto Gemini
+        async with _analysis_slot():
+            async for event in runner.run_async(
+                user_id=user_id,
+                session_id=session_id,
+                new_message=new_message
+            ):
+                # Partial events are never persisted, so their deltas don't count
+                if not event.partial and event.actions and event.actions.state_delta:
+                    final_state.update(event.actions.state_delta)
         
         # Extract agent outputs from session state
         # Agents output keys: generated_summary, recommendation, safety_guidelines
         
-        # DEBUG: Print session state to see what agents actually output
-        print(f"\n🔍 DEBUG - Final Session State:")
-        print(f"   State keys: {list(final_session.state.keys())}")
-        if 'generated_summary' in final_session.state:
-            summary_preview = str(final_session.state['generated_summary'])[:200]
-            print(f"   generated_summary: {summary_preview}...")
-        if 'recommendation' in final_session.state:
-            rec_preview = str(final_session.state['recommendation'])[:200]
-            print(f"   recommendation: {rec_preview}...")
-        if 'safety_guidelines' in final_session.state:
-            safety_preview = str(final_session.state['safety_guidelines'])[:100]
-            print(f"   safety_guidelines: {safety_preview}...")
+        # Session state as the agents left it (DEBUG only)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 Final session state keys: %s", list(final_state.keys()))
+            if 'generated_summary' in final_state:
+                logger.debug("   generated_summary: %.200s...", final_state['generated_summary'])
+            if 'recommendation' in final_state:
+                logger.debug("   recommendation: %.200s...", final_state['recommendation'])
+            if 'safety_guidelines' in final_state:
+                logger.debug("   safety_guidelines: %.100s...", final_state['safety_guidelines'])
         
         result = {
-            "generated_summary": final_session.state.get("generated_summary", final_result.get("generated_summary", "{}")),
-            "recommendation": final_session.state.get("recommendation", final_result.get("recommendation", "{}")),
-            "safety_guidelines": final_session.state.get("safety_guidelines", final_result.get("safety_guidelines", {})),
+            "generated_summary": final_state.get("generated_summary", "{}"),
+            "recommendation": final_state.get("recommendation", "{}"),
+            "safety_guidelines": final_state.get("safety_guidelines", {}),
+            "safety_feedback": final_state.get("safety_feedback", ""),
         }
         
-        # Merge any additional results from events
-        result.update(final_result)
-        
-        print(f"\n✅ Agent execution completed for session {session_id}")
-        print(f"📊 Result keys: {list(result.keys())}")
-        
-        # DEBUG: Print extracted results
-        print(f"\n🔍 DEBUG - Extracted Results:")
-        print(f"   generated_summary type: {type(result.get('generated_summary'))}")
-        print(f"   recommendation type: {type(result.get('recommendation'))}")
-        print(f"   safety_guidelines type: {type(result.get('safety_guidelines'))}")
+        logger.info("✅ Agent execution completed for session %s", session_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "🔍 Extracted result types: generated_summary=%s, recommendation=%s, safety_guidelines=%s",
+                type(result["generated_summary"]).__name__,
+                type(result["recommendation"]).__name__,
+                type(result["safety_guidelines"]).__name__,
+            )
         
         # Parse output into structured format
         structured_output = parse_agent_output(result, mode)
         
         # Add metadata
-        structured_output["session_id"] = session_id or f"session_{datetime.utcnow().timestamp()}"
+        structured_output["session_id"] = session_id
         structured_output["mode"] = mode
-        structured_output["created_at"] = datetime.utcnow().isoformat()
+        structured_output["created_at"] = now_iso
+        # The refiner's save runs in the background: "pending" (durably queued),
+        # "saved", "failed", or "not_saved" if the agents never submitted it
+        structured_output["save_status"] = get_mcp_toolset().save_status(session_id) or "not_saved"
         
-        print(f"💾 Analysis structured and ready for session {session_id}")
+        logger.debug("💾 Analysis structured and ready for session %s", session_id)
         
         return structured_output
         
     except Exception as e:
-        print(f"❌ Error in agent execution for session {session_id}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error in agent execution for session %s: %s", session_id, e)
         
         # Return error in expected format
         return {
-            "session_id": session_id or f"session_error_{datetime.utcnow().timestamp()}",
+            "session_id": session_id,
             "mode": mode,
             "transcript_summary": {
                 "summary": f"Analysis encountered an error. Our team has been notified.",
@@ -443,31 +472,36 @@ async def run_wellness_analysis(
             },
             "safety_approved": True,
             "safety_score": 1.0,
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": now_iso,
             "error": str(e),
         }
+    finally:
+        # Everything needed was read from state; don't keep it in the shared service
+        await session_service.delete_session(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id
+        )
 
 
-def sync_run_wellness_analysis(transcript: str, mode: str, user_id: str, session_id: Optional[str] = None) -> Dict:
+async def warmup() -> None:
     """
-    Synchronous wrapper for run_wellness_analysis
+    Start the agents' backing services ahead of the first analysis.
     
-    Args:
-        transcript: Voice journal transcript
-        mode: 'study' or 'general'
-        user_id: User identifier
-        session_id: Optional session identifier
-        
-    Returns:
-        Structured analysis result
+    Lists the MCP tools (spawns the stdio server or imports the in-process
+    tools) and builds the shared Mem0 client, whose constructor validates the
+    API key over HTTP. No model call is made: a warmup analysis would spend
+    tokens and write to Mem0 / Firestore. Failures are logged, not raised.
     """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        result = loop.run_until_complete(
-            run_wellness_analysis(transcript, mode, user_id, session_id)
-        )
-        return result
-    finally:
-        loop.close()
+    async def _warm_mem0():
+        try:
+            await asyncio.to_thread(get_mem0_client)
+        except Exception as e:
+            logger.warning("⚠️  Mem0 warmup failed (will retry on first request): %s", e)
+    
+    await asyncio.gather(warmup_mcp(), _warm_mem0())
+
 
+async def shutdown() -> None:
+    """Let queued background saves finish; call on the server loop before it stops"""
+    await get_mcp_toolset().drain()
@@ -5,8 +5,13 @@ Processes enhanced datasets and uploads them to Google Cloud Storage for Vertex
 
 import os
 import json
+import asyncio
 import logging
-from typing import List, Dict, Any
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count, islice
+from typing import List, Dict, Any, Iterator
 from datetime import datetime
 from pathlib import Path
 import pandas as pd
@@ -17,8 +22,43 @@ from google.cloud import aiplatform
 import vertexai
 from vertexai import rag
 
+# orjson serializes the uploaded documents straight to UTF-8 bytes and parses
+# the source JSON from bytes, several times faster than the stdlib (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+else:
+    def json_dumps(payload) -> bytes:
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    json_loads = json.loads
+
+# ijson streams the counsel chat conversations instead of parsing the whole
+# file into memory first (optional)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Each GCS upload is a blocking HTTPS round trip; overlap this many at once
+UPLOAD_WORKERS = int(os.getenv("DATASET_UPLOAD_WORKERS", "16"))
+
+# Markdown sections are small, so several share one NDJSON object instead of
+# paying a PUT each; 20 matches the counsel chat batches and the import batch size
+SECTIONS_PER_FILE = 20
+
+# A Markdown header line: '#' after optional indentation
+HEADER_LINE = re.compile(r"^[^\S\n]*#", re.MULTILINE)
+NON_SPACE = re.compile(r"\S")
+
 class DatasetProcessor:
     """Processes datasets and uploads them to Google Cloud Storage for RAG"""
     
@@ -26,10 +66,11 @@ class DatasetProcessor:
         self.project_id = project_id
         self.bucket_name = bucket_name or f"{project_id}-rag-datasets"
         self.storage_client = storage.Client(project=project_id)
-        self._ensure_bucket_exists()
+        # Shared by every upload (and the upload worker threads)
+        self._bucket = self._ensure_bucket_exists()
         
-    def _ensure_bucket_exists(self):
-        """Ensure the GCS bucket exists for storing datasets"""
+    def _ensure_bucket_exists(self) -> storage.Bucket:
+        """Ensure the GCS bucket exists for storing datasets and return it"""
         try:
             bucket = self.storage_client.bucket(self.bucket_name)
             if not bucket.exists():
@@ -37,6 +78,7 @@ class DatasetProcessor:
                 logger.info(f"Created bucket: {self.bucket_name}")
             else:
                 logger.info(f"Using existing bucket: {self.bucket_name}")
+            return bucket
         except Exception as e:
             logger.error(f"Error with bucket {self.bucket_name}: {e}")
             raise
@@ -45,33 +87,21 @@ class DatasetProcessor:
         """Process the academic success knowledge base and upload to GCS"""
         try:
             # Read the academic success knowledge base
-            with open(dataset_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = Path(dataset_path).read_text(encoding='utf-8')
             
             # Split into logical sections for better retrieval
             sections = self._split_into_sections(content)
             
-            uploaded_files = []
-            for i, section in enumerate(sections):
-                # Create a structured document
-                doc = {
-                    "title": f"Academic Success Guide Section {i+1}",
-                    "content": section,
-                    "type": "academic_guidance",
-                    "metadata": {
-                        "source": "academic_success_knowledge_base.md",
-                        "section_id": i,
-                        "created_at": datetime.now().isoformat(),
-                        "agent_mode": "study"
-                    }
-                }
-                
-                # Upload to GCS
-                filename = f"academic_dataset/section_{i+1}.json"
-                gcs_uri = self._upload_to_gcs(doc, filename)
-                uploaded_files.append(gcs_uri)
-                
-            logger.info(f"Processed academic dataset into {len(uploaded_files)} sections")
+            uploaded_files = self._upload_sections(
+                sections,
+                prefix="academic_dataset",
+                title="Academic Success Guide",
+                doc_type="academic_guidance",
+                source="academic_success_knowledge_base.md",
+                agent_mode="study",
+            )
+            
+            logger.info(f"Processed academic dataset into {len(sections)} sections ({len(uploaded_files)} files)")
             return uploaded_files
             
         except Exception as e:
@@ -82,33 +112,21 @@ class DatasetProcessor:
         """Process the enhanced wellness dataset and upload to GCS"""
         try:
             # Read the enhanced wellness dataset
-            with open(dataset_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = Path(dataset_path).read_text(encoding='utf-8')
             
             # Split into logical sections for better retrieval
             sections = self._split_into_sections(content)
             
-            uploaded_files = []
-            for i, section in enumerate(sections):
-                # Create a structured document
-                doc = {
-                    "title": f"Wellness Guide Section {i+1}",
-                    "content": section,
-                    "type": "wellness_counseling",
-                    "metadata": {
-                        "source": "enhanced_wellness_dataset.md",
-                        "section_id": i,
-                        "created_at": datetime.now().isoformat(),
-                        "agent_mode": "wellness"
-                    }
-                }
-                
-                # Upload to GCS
-                filename = f"wellness_dataset/section_{i+1}.json"
-                gcs_uri = self._upload_to_gcs(doc, filename)
-                uploaded_files.append(gcs_uri)
-                
-            logger.info(f"Processed wellness dataset into {len(uploaded_files)} sections")
+            uploaded_files = self._upload_sections(
+                sections,
+                prefix="wellness_dataset",
+                title="Wellness Guide",
+                doc_type="wellness_counseling",
+                source="enhanced_wellness_dataset.md",
+                agent_mode="wellness",
+            )
+            
+            logger.info(f"Processed wellness dataset into {len(sections)} sections ({len(uploaded_files)} files)")
             return uploaded_files
             
         except Exception as e:
@@ -119,33 +137,21 @@ class DatasetProcessor:
         """Process the mental health knowledge base and upload to GCS"""
         try:
             # Read the mental health knowledge base
-            with open(dataset_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = Path(dataset_path).read_text(encoding='utf-8')
             
             # Split into logical sections for better retrieval
             sections = self._split_into_sections(content)
             
-            uploaded_files = []
-            for i, section in enumerate(sections):
-                # Create a structured document
-                doc = {
-                    "title": f"Mental Health Guide Section {i+1}",
-                    "content": section,
-                    "type": "mental_health_support",
-                    "metadata": {
-                        "source": "mental_health_knowledge_base.md",
-                        "section_id": i,
-                        "created_at": datetime.now().isoformat(),
-                        "agent_mode": "wellness"
-                    }
-                }
-                
-                # Upload to GCS
-                filename = f"mental_health_dataset/section_{i+1}.json"
-                gcs_uri = self._upload_to_gcs(doc, filename)
-                uploaded_files.append(gcs_uri)
-                
-            logger.info(f"Processed mental health dataset into {len(uploaded_files)} sections")
+            uploaded_files = self._upload_sections(
+                sections,
+                prefix="mental_health_dataset",
+                title="Mental Health Guide",
+                doc_type="mental_health_support",
+                source="mental_health_knowledge_base.md",
+                agent_mode="wellness",
+            )
+            
+            logger.info(f"Processed mental health dataset into {len(sections)} sections ({len(uploaded_files)} files)")
             return uploaded_files
             
         except Exception as e:
@@ -155,21 +161,22 @@ class DatasetProcessor:
     def process_counsel_chat_json_dataset(self, dataset_path: str) -> List[str]:
         """Process the counsel chat JSON dataset and upload to GCS"""
         try:
-            # Read the counsel chat JSON file
-            with open(dataset_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # Stream the training conversations from the counsel chat JSON file
+            conversations = self._iter_counsel_chat_conversations(dataset_path)
             
             uploaded_files = []
-            
-            # Process the training data
-            if 'train' in data and isinstance(data['train'], list):
-                conversations = data['train']
-                
-                # Process in batches to avoid memory issues and stay under 25-file limit
-                batch_size = 20
-                for batch_start in range(0, len(conversations), batch_size):
-                    batch_end = min(batch_start + batch_size, len(conversations))
-                    batch_conversations = conversations[batch_start:batch_end]
+            # One timestamp for the whole import rather than one per utterance
+            created_at = datetime.now().isoformat()
+            
+            # Process in batches to avoid memory issues and stay under 25-file limit
+            batch_size = 20
+            # Uploads in flight, oldest first; capped so parsing can't run far ahead of them
+            pending = deque()
+            with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                for batch_start in count(0, batch_size):
+                    batch_conversations = list(islice(conversations, batch_size))
+                    if not batch_conversations:
+                        break
                     
                     batch_docs = []
                     for i, conversation in enumerate(batch_conversations):
@@ -195,7 +202,7 @@ class DatasetProcessor:
                                                 "source": "counsel_chat_250-tokens_full.json",
                                                 "conversation_id": batch_start + i,
                                                 "utterance_id": j,
-                                                "created_at": datetime.now().isoformat(),
+                                                "created_at": created_at,
                                                 "agent_mode": "wellness"
                                             }
                                         }
@@ -204,8 +211,11 @@ class DatasetProcessor:
                     # Upload batch to GCS
                     if batch_docs:
                         filename = f"counsel_chat_json/batch_{batch_start//batch_size + 1}.json"
-                        gcs_uri = self._upload_batch_to_gcs(batch_docs, filename)
-                        uploaded_files.append(gcs_uri)
+                        pending.append(executor.submit(self._upload_batch_to_gcs, batch_docs, filename))
+                        if len(pending) > 2 * UPLOAD_WORKERS:
+                            uploaded_files.append(pending.popleft().result())
+                
+                uploaded_files.extend(future.result() for future in pending)
             
             logger.info(f"Processed counsel chat JSON dataset into {len(uploaded_files)} batches")
             return uploaded_files
@@ -214,69 +224,101 @@ class DatasetProcessor:
             logger.error(f"Failed to process counsel chat JSON dataset: {e}")
             return []
     
+    def _iter_counsel_chat_conversations(self, dataset_path: str) -> Iterator[Dict[str, Any]]:
+        """Yield the conversations under "train", streamed with ijson when it is installed"""
+        if IJSON_AVAILABLE:
+            with open(dataset_path, 'rb') as f:
+                yield from ijson.items(f, 'train.item')
+            return
+        
+        data = json_loads(Path(dataset_path).read_bytes())
+        if 'train' in data and isinstance(data['train'], list):
+            yield from data['train']
+    
+    def _section_doc(
+        self, i: int, section: str, title: str, doc_type: str, source: str, agent_mode: str, created_at: str
+    ) -> Dict[str, Any]:
+        """Build the structured document for one section"""
+        return {
+            "title": f"{title} Section {i+1}",
+            "content": section,
+            "type": doc_type,
+            "metadata": {
+                "source": source,
+                "section_id": i,
+                "created_at": created_at,
+                "agent_mode": agent_mode
+            }
+        }
+    
+    def _upload_sections(
+        self, sections: List[str], prefix: str, title: str, doc_type: str, source: str, agent_mode: str
+    ) -> List[str]:
+        """Upload sections as NDJSON files of SECTIONS_PER_FILE documents; returns the GCS URIs in order"""
+        created_at = datetime.now().isoformat()
+        docs = [
+            self._section_doc(i, section, title, doc_type, source, agent_mode, created_at)
+            for i, section in enumerate(sections)
+        ]
+        files = [
+            (docs[start:start + SECTIONS_PER_FILE], f"{prefix}/sections_{start // SECTIONS_PER_FILE + 1}.ndjson")
+            for start in range(0, len(docs), SECTIONS_PER_FILE)
+        ]
+        with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+            return list(executor.map(lambda file: self._upload_ndjson_to_gcs(*file), files))
+    
     def _split_into_sections(self, content: str) -> List[str]:
         """Split content into logical sections based on headers"""
-        sections = []
-        current_section = []
+        # Slice the original string at each header line rather than splitting
+        # it into lines and joining them back together per section
+        starts = [0] + [match.start() for match in HEADER_LINE.finditer(content, 1)]
+        ends = [start - 1 for start in starts[1:]] + [len(content)]
         
-        lines = content.split('\n')
-        for line in lines:
-            # Check if this is a header (starts with #)
-            if line.strip().startswith('#'):
-                # Save current section if it has content
-                if current_section:
-                    sections.append('\n'.join(current_section))
-                    current_section = []
-            
-            current_section.append(line)
-        
-        # Add the last section
-        if current_section:
-            sections.append('\n'.join(current_section))
-        
-        # Filter out very short sections
-        sections = [section for section in sections if len(section.strip()) > 200]
+        sections = []
+        for start, end in zip(starts, ends):
+            # Filter out very short sections: keep those whose stripped length is
+            # over 200, i.e. with a non-space character 200+ past the first one.
+            # Searching the bounds of content avoids copying the section to strip it
+            first = NON_SPACE.search(content, start, end)
+            if first and NON_SPACE.search(content, first.start() + 200, end):
+                sections.append(content[start:end])
         
         return sections
     
-    def _upload_to_gcs(self, doc: Dict[str, Any], filename: str) -> str:
-        """Upload a single document to Google Cloud Storage"""
+    def _upload_batch_to_gcs(self, docs: List[Dict[str, Any]], filename: str) -> str:
+        """Upload a batch of documents to Google Cloud Storage"""
         try:
-            bucket = self.storage_client.bucket(self.bucket_name)
-            blob = bucket.blob(filename)
+            blob = self._bucket.blob(filename)
             
-            # Convert to JSON string
-            json_content = json.dumps(doc, indent=2, ensure_ascii=False)
+            # Convert to JSON array (UTF-8 bytes, uploaded as-is)
+            json_content = json_dumps(docs)
             
             # Upload
             blob.upload_from_string(json_content, content_type='application/json')
             
             gcs_uri = f"gs://{self.bucket_name}/{filename}"
-            logger.debug(f"Uploaded document to: {gcs_uri}")
+            logger.debug(f"Uploaded batch to: {gcs_uri}")
             return gcs_uri
             
         except Exception as e:
-            logger.error(f"Failed to upload document {filename}: {e}")
+            logger.error(f"Failed to upload batch {filename}: {e}")
             raise
-    
-    def _upload_batch_to_gcs(self, docs: List[Dict[str, Any]], filename: str) -> str:
-        """Upload a batch of documents to Google Cloud Storage"""
+
+    def _upload_ndjson_to_gcs(self, docs: List[Dict[str, Any]], filename: str) -> str:
+        """Upload documents to Google Cloud Storage as one NDJSON file (one document per line)"""
         try:
-            bucket = self.storage_client.bucket(self.bucket_name)
-            blob = bucket.blob(filename)
+            blob = self._bucket.blob(filename)
             
-            # Convert to JSON array
-            json_content = json.dumps(docs, indent=2, ensure_ascii=False)
+            ndjson_content = b"\n".join(json_dumps(doc) for doc in docs)
             
-            # Upload
-            blob.upload_from_string(json_content, content_type='application/json')
+            blob.upload_from_string(ndjson_content, content_type='application/x-ndjson')
             
             gcs_uri = f"gs://{self.bucket_name}/{filename}"
-            logger.debug(f"Uploaded batch to: {gcs_uri}")
+            logger.debug(f"Uploaded {len(docs)} documents to: {gcs_uri}")
             return gcs_uri
             
         except Exception as e:
-            logger.error(f"Failed to upload batch {filename}: {e}")
+            logger.error(f"Failed to upload documents {filename}: {e}")
             raise
 
 class RAGCorpusManager:
@@ -307,8 +349,9 @@ class RAGCorpusManager:
                 )
             )
             
-            # Create corpus
-            corpus = rag.create_corpus(
+            # Create corpus (blocking API call, kept off the event loop)
+            corpus = await asyncio.to_thread(
+                rag.create_corpus,
                 display_name=corpus_name,
                 description=description,
                 backend_config=backend_config,
@@ -327,8 +370,9 @@ class RAGCorpusManager:
         try:
             vertexai.init(project=self.project_id, location=self.location)
             
-            # List all corpora in the project
-            corpora = rag.list_corpora()
+            # List all corpora in the project; the pager fetches further pages
+            # while iterating, so drain it in the worker thread too
+            corpora = await asyncio.to_thread(lambda: list(rag.list_corpora()))
             
             for corpus in corpora:
                 if corpus.display_name == corpus_name:
@@ -363,8 +407,9 @@ class RAGCorpusManager:
                 
                 logger.info(f"📦 Processing batch {batch_start//max_files_per_batch + 1}: files {batch_start+1}-{batch_end}")
                 
-                # Import files using high-level API
-                response = rag.import_files(
+                # Import files using high-level API (blocks until the batch is indexed)
+                response = await asyncio.to_thread(
+                    rag.import_files,
                     corpus_name=corpus_name,
                     paths=batch_uris,
                     transformation_config=rag.TransformationConfig(
@@ -415,8 +460,10 @@ async def process_and_upload_datasets() -> Dict[str, str]:
     try:
         corpus_ids = {}
         
+        # The processors block on file reads and GCS uploads; keep them off the event loop
         # Process academic success dataset
-        academic_files = dataset_processor.process_academic_dataset(
+        academic_files = await asyncio.to_thread(
+            dataset_processor.process_academic_dataset,
             "/home/vatsal/Hackathons/GenAIExchange/FullStackR2/backend/rag_dataset/academic_success_knowledge_base.md"
         )
         
@@ -429,7 +476,8 @@ async def process_and_upload_datasets() -> Dict[str, str]:
             corpus_ids["study"] = academic_corpus_id
         
         # Process mental health knowledge base
-        mental_health_files = dataset_processor.process_mental_health_dataset(
+        mental_health_files = await asyncio.to_thread(
+            dataset_processor.process_mental_health_dataset,
             "/home/vatsal/Hackathons/GenAIExchange/FullStackR2/backend/rag_dataset/mental_health_knowledge_base.md"
         )
         
@@ -442,7 +490,8 @@ async def process_and_upload_datasets() -> Dict[str, str]:
             corpus_ids["wellness"] = wellness_corpus_id
         
         # Process counsel chat JSON dataset (additional wellness content)
-        counsel_chat_files = dataset_processor.process_counsel_chat_json_dataset(
+        counsel_chat_files = await asyncio.to_thread(
+            dataset_processor.process_counsel_chat_json_dataset,
             "/home/vatsal/Hackathons/GenAIExchange/FullStackR2/backend/rag_dataset/counsel_chat_250-tokens_full.json"
         )
         
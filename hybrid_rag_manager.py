@@ -11,6 +11,8 @@ import asyncio
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import time
+from collections import deque
+from itertools import islice
 
 # Google Cloud imports
 from google.cloud import aiplatform
@@ -146,11 +148,11 @@ class HybridRAGManager:
             cache_key = f"{mode}:{hash(query)}"
             if cache_key in self.retrieval_cache:
                 cached_result, timestamp = self.retrieval_cache[cache_key]
-                if time.time() - timestamp < self.cache_ttl:
-                    logger.debug(f"Using cached retrieval for query: {query[:50]}...")
+                if time.monotonic() - timestamp < self.cache_ttl:
+                    logger.debug("Using cached retrieval for query: %.50s...", query)
                     return cached_result
             
-            logger.info(f"🔍 Retrieving context for {mode} mode query: {query[:100]}...")
+            logger.info("🔍 Retrieving context for %s mode query: %.100s...", mode, query)
             
             # Perform RAG retrieval
             try:
@@ -199,7 +201,7 @@ class HybridRAGManager:
             context_text = "\n\n".join(context_parts)
             
             # Cache the result
-            self.retrieval_cache[cache_key] = ((context_text, retrieved_docs), time.time())
+            self.retrieval_cache[cache_key] = ((context_text, retrieved_docs), time.monotonic())
             
             # Clean old cache entries
             self._clean_cache()
@@ -261,7 +263,7 @@ class HybridRAGManager:
     
     def _clean_cache(self):
         """Clean expired cache entries"""
-        current_time = time.time()
+        current_time = time.monotonic()
         expired_keys = [
             key for key, (_, timestamp) in self.retrieval_cache.items()
             if current_time - timestamp > self.cache_ttl
@@ -292,13 +294,14 @@ class ConversationContextManager:
     
     def __init__(self, rag_manager: HybridRAGManager):
         self.rag_manager = rag_manager
-        self.conversation_history = {}  # Store conversation history per client
+        self.conversation_history: Dict[str, deque] = {}  # Store conversation history per client
         self.max_history_length = 10  # Keep last 10 exchanges
     
     def add_exchange(self, client_id: str, user_input: str, context: str, response: str):
         """Add a conversation exchange to history"""
         if client_id not in self.conversation_history:
-            self.conversation_history[client_id] = []
+            # Bounded: appending past max_history_length drops the oldest exchange
+            self.conversation_history[client_id] = deque(maxlen=self.max_history_length)
         
         exchange = {
             "timestamp": datetime.now().isoformat(),
@@ -308,17 +311,14 @@ class ConversationContextManager:
         }
         
         self.conversation_history[client_id].append(exchange)
-        
-        # Keep only recent history
-        if len(self.conversation_history[client_id]) > self.max_history_length:
-            self.conversation_history[client_id] = self.conversation_history[client_id][-self.max_history_length:]
     
     def get_conversation_context(self, client_id: str, max_turns: int = 3) -> str:
         """Get recent conversation context for better RAG retrieval"""
         if client_id not in self.conversation_history:
             return ""
         
-        recent_exchanges = self.conversation_history[client_id][-max_turns:]  # Last N exchanges
+        history = self.conversation_history[client_id]
+        recent_exchanges = islice(history, max(0, len(history) - max_turns), None)  # Last N exchanges
         context_parts = []
         
         for exchange in recent_exchanges:
@@ -387,7 +387,7 @@ class HybridRAGVoiceAgent:
             if input_type == "audio_transcription":
                 # For audio transcriptions, add context about it being spoken input
                 enhanced_query = f"{conversation_context}\n\nSpoken input: {user_input}" if conversation_context else f"Spoken input: {user_input}"
-                logger.info(f"🎤 Processing audio transcription with RAG: {user_input[:100]}...")
+                logger.info("🎤 Processing audio transcription with RAG: %.100s...", user_input)
             elif input_type == "audio":
                 # For raw audio, create a descriptive query
                 enhanced_query = f"{conversation_context}\n\nAudio input received" if conversation_context else "Audio input received"
@@ -395,7 +395,7 @@ class HybridRAGVoiceAgent:
             else:
                 # For text input
                 enhanced_query = f"{conversation_context}\n\nCurrent query: {user_input}" if conversation_context else user_input
-                logger.info(f"📝 Processing text input with RAG: {user_input[:100]}...")
+                logger.info("📝 Processing text input with RAG: %.100s...", user_input)
             
             # Retrieve relevant context with reduced top_k to limit tokens (optimized for speed)
             context_text, retrieved_docs = await self.rag_manager.retrieve_context(
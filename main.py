@@ -1,7 +1,13 @@
+import asyncio
+import atexit
+import queue
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
 from firebase_db import initialize_firebase
 # REMOVED: voice_agent_journal router (PostgreSQL) - using Firebase voice_journal router instead
@@ -11,6 +17,7 @@ from routers.voice_journal import router as voice_journal_router  # ✅ Firebase
 from routers.priority_matrix import router as pm_router
 from routers.auth import router as auth_router
 from routers.chat import router as chat_router
+from routers.chat_manager import manager as chat_manager
 from routers.daily_journal import router as daily_journal_router
 from routers.moodboard import router as moodboard_router
 from routers.stats import router as stats_router
@@ -27,6 +34,15 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Hand records to a background thread so request handlers never block on
+# stdout or the voice agent's log file
+_root_logger = logging.getLogger()
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *_root_logger.handlers, respect_handler_level=True)
+_root_logger.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 # Load environment variables - try .env.production first (for Cloud Run), then .env (for local dev)
 env_path = Path(".env.production")
 if env_path.exists():
@@ -65,13 +81,38 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Firebase initialization failed: {e}")
         logger.warning("⚠️ Some features may not work without Firebase")
     
+    # Warm the agents' MCP toolset and Mem0 client in the background so the first
+    # analysis request doesn't pay for the MCP server start and client setup
+    try:
+        from agents.orchestrator import warmup as warmup_agents, shutdown as shutdown_agents
+        app.state.agents_warmup = asyncio.create_task(warmup_agents())
+    except ImportError as e:
+        shutdown_agents = None
+        logger.debug(f"Agents not available, skipping agent warmup: {str(e)}")
+    
+    # Relay chat broadcasts between workers/instances over Redis (if REDIS_URL is set)
+    await chat_manager.start_pubsub()
+    
     yield
     
     # Cleanup on shutdown (if needed)
     logger.info("Application shutting down...")
+    await chat_manager.stop_pubsub()
+    if shutdown_agents is not None:
+        await shutdown_agents()
 
 
-app = FastAPI(lifespan=lifespan)
+# orjson renders response bodies several times faster than the stdlib encoder
+try:
+    import orjson  # noqa: F401
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if ORJSON_AVAILABLE else JSONResponse,
+)
 
 # CORS configuration - support both local development and production
 # Get additional origins from environment variable (comma-separated)
@@ -99,21 +140,28 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Compress JSON list responses (posts, comments, journals); small bodies and
+# WebSockets pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
 
 @app.get("/")
 async def root():
     return {"message": "Sahay Backend API - Ready", "version": "1.0", "docs": "/docs"}
 
 
-@app.get("/health")
-async def health_check():
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'","service":"sahay-backend","database":"firebase"}'
+
+
+async def health_check(request):
     """Health check endpoint for Cloud Run and monitoring"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "service": "sahay-backend",
-        "database": "firebase",
-    }
+    # Plain Starlette route: probes skip FastAPI's dependency and serialization layers
+    timestamp = datetime.now(timezone.utc).isoformat().encode()
+    return Response(_HEALTH_PREFIX + timestamp + _HEALTH_SUFFIX, media_type="application/json")
+
+
+app.add_route("/health", health_check, methods=["GET"], include_in_schema=False)
 
 
 @app.get("/health-de1f4b3133627b2cacac9aad5ddfe07c")
@@ -1107,6 +1107,7 @@ class VoiceJournalAnalysisResult(BaseModel):
     safety_approved: bool
     safety_score: Optional[float] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    save_status: Optional[str] = None  # pending | saved | failed | not_saved
 
 
 class TriggerAnalysisInput(BaseModel):
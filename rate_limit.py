@@ -0,0 +1,80 @@
+"""
+Per-user rate limiting for the expensive endpoints.
+
+Agent analyses (several Gemini calls each) and chat WebSocket connections
+(a socket plus a writer task held for the session) are capped per user with
+a fixed-window counter. With REDIS_URL set the counters live in Redis
+(`ratelimit:{name}:{user_id}:{window}`, INCR + EXPIRE) and are shared by every
+instance; otherwise each process counts on its own. A Redis outage fails open.
+"""
+
+import logging
+import os
+import time
+from functools import lru_cache
+
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, status
+
+from utils import get_current_user
+
+try:
+    import redis.asyncio as aioredis
+    from redis import RedisError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Requests per user per minute
+ANALYSIS_RATE_LIMIT = int(os.getenv("ANALYSIS_RATE_LIMIT", "3"))
+WS_CONNECT_RATE_LIMIT = int(os.getenv("WS_CONNECT_RATE_LIMIT", "10"))
+
+
+@lru_cache(maxsize=None)
+def _get_redis():
+    """Redis client for the shared counters, or None; REDIS_URL is read on first use (after .env is loaded)"""
+    redis_url = os.getenv("REDIS_URL")
+    if not redis_url:
+        return None
+    if not REDIS_AVAILABLE:
+        logger.warning("⚠️  REDIS_URL is set but redis is not installed; rate limits are per process")
+        return None
+    return aioredis.Redis.from_url(redis_url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+
+# Fallback counters: (key, window) -> count
+_local_counts = TTLCache(maxsize=10_000, ttl=3600)
+
+
+async def allow(name: str, user_id: str, limit: int, window_seconds: int = 60) -> bool:
+    """Count one hit for user_id against `name`; False once the window's limit is exceeded"""
+    window = int(time.time() // window_seconds)
+    key = f"ratelimit:{name}:{user_id}:{window}"
+
+    redis_client = _get_redis()
+    if redis_client is not None:
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                count, _ = await pipe.incr(key).expire(key, window_seconds).execute()
+            return count <= limit
+        except RedisError as e:
+            logger.warning(f"⚠️  Rate limit check failed, allowing request: {e}")
+            return True
+
+    count = _local_counts.get(key, 0) + 1
+    _local_counts[key] = count
+    return count <= limit
+
+
+def rate_limit(name: str, limit: int, window_seconds: int = 60):
+    """FastAPI dependency that answers 429 once the current user exceeds `limit` per window"""
+    async def dependency(current_user = Depends(get_current_user)):
+        if not await allow(name, str(current_user.user_id), limit, window_seconds):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(window_seconds - int(time.time()) % window_seconds)},
+            )
+    return dependency
@@ -11,11 +11,14 @@ from utils import verify_password, create_jwt, hash_password
 from typing import Annotated
 from datetime import datetime
 from google.cloud.firestore_v1 import SERVER_TIMESTAMP
+import logging
 import uuid
 
 from firebase_db import get_firestore
 from utils import add_user_to_default_servers
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["Authentication"])
 
 
@@ -111,7 +114,7 @@ def create_new_account(login_data: SignupData):
             add_user_to_default_servers(user_id)
         except Exception as e:
             # Don't fail signup if server addition fails
-            print(f"⚠️ Warning: Could not add user to default servers: {e}")
+            logger.warning(f"⚠️ Warning: Could not add user to default servers: {e}")
         
         return {
             "message": "User created successfully",
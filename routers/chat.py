@@ -14,9 +14,10 @@ from fastapi import (
     status,
 )
 from typing import List, Set, Dict, Optional
+import asyncio
+import logging
 import uuid
 from datetime import datetime
-import json
 
 from firebase_db import get_firestore
 from google.cloud.firestore_v1 import SERVER_TIMESTAMP, ArrayUnion
@@ -30,7 +31,10 @@ from model import (
     ChannelResponse,
     MessageResponse,
 )
-from routers.chat_manager import manager
+from routers.chat_manager import manager, decode_message
+from rate_limit import allow, WS_CONNECT_RATE_LIMIT
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -51,7 +55,7 @@ def user_has_server_access(db, user_id: str, server_id: str) -> bool:
         member_ids = server_data.get('member_ids', [])
         return user_id in member_ids
     except Exception as e:
-        print(f"Error checking server access: {e}")
+        logger.error(f"Error checking server access: {e}")
         return False
 
 
@@ -68,7 +72,7 @@ def get_user_role_in_server(db, user_id: str, server_id: str) -> Optional[str]:
             return docs[0].to_dict().get('role', 'member')
         return None
     except Exception as e:
-        print(f"Error getting user role: {e}")
+        logger.error(f"Error getting user role: {e}")
         return None
 
 
@@ -84,7 +88,7 @@ def get_server_members(db, server_id: str) -> Set[str]:
         server_data = server_doc.to_dict()
         return set(server_data.get('member_ids', []))
     except Exception as e:
-        print(f"Error getting server members: {e}")
+        logger.error(f"Error getting server members: {e}")
         return set()
 
 
@@ -119,7 +123,7 @@ def get_user_accessible_servers(db, user_id: str) -> List[dict]:
         
         return servers
     except Exception as e:
-        print(f"Error getting accessible servers: {e}")
+        logger.error(f"Error getting accessible servers: {e}")
         return []
 
 
@@ -177,12 +181,14 @@ async def create_server(data: CreateServerData, token: TokenDep):
             "updated_at": SERVER_TIMESTAMP,
         }
         
-        server_ref.set(server_data)
+        # Server, admin membership and general channel are written in one commit
+        batch = db.batch()
+        batch.set(server_ref, server_data)
         
         # Create membership record
         membership_id = str(uuid.uuid4())
         memberships_ref = db.collection('serverMemberships')
-        memberships_ref.document(membership_id).set({
+        batch.set(memberships_ref.document(membership_id), {
             "server_id": server_id,
             "user_id": user_id,
             "role": "admin",
@@ -192,12 +198,13 @@ async def create_server(data: CreateServerData, token: TokenDep):
         # Create default general channel
         channels_ref = server_ref.collection('channels')
         general_channel_id = str(uuid.uuid4())
-        channels_ref.document(general_channel_id).set({
+        batch.set(channels_ref.document(general_channel_id), {
             "name": "general",
             "type": "text",
             "position": 0,
             "created_at": SERVER_TIMESTAMP,
         })
+        batch.commit()
         
         return {
             "id": server_id,
@@ -241,20 +248,21 @@ async def join_server(server_id: str, token: TokenDep):
                 detail="You are already a member of this server",
             )
         
-        # Add user to server's member_ids
-        server_ref.update({
+        # Add user to server's member_ids and create the membership record in one commit
+        batch = db.batch()
+        batch.update(server_ref, {
             "member_ids": ArrayUnion([user_id])
         })
         
-        # Create membership record
         membership_id = str(uuid.uuid4())
         memberships_ref = db.collection('serverMemberships')
-        memberships_ref.document(membership_id).set({
+        batch.set(memberships_ref.document(membership_id), {
             "server_id": server_id,
             "user_id": user_id,
             "role": "member",
             "joined_at": SERVER_TIMESTAMP,
         })
+        batch.commit()
         
         return {
             "message": "Successfully joined server",
@@ -389,23 +397,13 @@ async def get_channel_messages(
         server_ref = db.collection('chatServers').document(server_id)
         messages_ref = server_ref.collection('messages')
         
-        # Query messages for this channel (filter in Python to avoid index)
-        all_messages = list(messages_ref.stream())
-        
-        # Filter by channel_id
-        channel_messages = [
-            doc for doc in all_messages 
-            if doc.to_dict().get('channel_id') == channel_id
-        ]
-        
-        # Sort by created_at (newest first for pagination, then reverse)
-        channel_messages.sort(
-            key=lambda x: x.to_dict().get('created_at', datetime.min),
-            reverse=True
-        )
-        
-        # Apply pagination
-        paginated = channel_messages[offset:offset+limit]
+        # Newest page of this channel only, via the (channel_id, created_at DESC)
+        # index in firestore.indexes.json instead of reading every server message
+        query = messages_ref.where('channel_id', '==', channel_id)\
+                            .order_by('created_at', direction='DESCENDING')\
+                            .offset(offset)\
+                            .limit(limit)
+        paginated = list(query.stream())
         
         # Build response (reverse to chronological order)
         messages = []
@@ -458,10 +456,19 @@ async def websocket_endpoint(
         user_id = str(token_data.user_id)
         username = token_data.username
     except Exception as e:
-        print(f"WebSocket authentication failed: {e}")
+        logger.warning(f"WebSocket authentication failed: {e}")
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
     
+    # Reconnect storms hold sockets and writer tasks; cap connects per user.
+    # Accept first: closing before the handshake is sent as an HTTP 403, and
+    # clients only see the 1013 (try again later) on an open socket
+    if not await allow("ws_connect", user_id, WS_CONNECT_RATE_LIMIT):
+        logger.warning(f"WebSocket connect rate limit exceeded for user {user_id}")
+        await websocket.accept()
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+    
     # Connect user
     await manager.connect(user_id, websocket)
     
@@ -483,7 +490,7 @@ async def websocket_endpoint(
         while True:
             # Receive message from client
             data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = decode_message(data)
             event_type = message_data.get("type")
             
             if event_type == "send_message":
@@ -519,7 +526,20 @@ async def websocket_endpoint(
                     "created_at": SERVER_TIMESTAMP,
                 }
                 
-                messages_ref.document(message_id).set(message_doc)
+                # Written in a worker thread so the loop keeps serving other
+                # sockets; only broadcast once the message is actually stored
+                try:
+                    await asyncio.to_thread(messages_ref.document(message_id).set, message_doc)
+                except Exception as e:
+                    logger.error(f"❌ Failed to save chat message {message_id}: {e}")
+                    await manager.send_personal(
+                        user_id,
+                        {
+                            "type": "error",
+                            "message": "Failed to save your message, please try again",
+                        },
+                    )
+                    continue
                 
                 # Prepare broadcast message
                 broadcast_data = {
@@ -593,9 +613,7 @@ async def websocket_endpoint(
     
     except WebSocketDisconnect:
         manager.disconnect(user_id)
-        print(f"User {username} disconnected")
+        logger.info(f"User {username} disconnected")
     except Exception as e:
-        print(f"WebSocket error for user {username}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"WebSocket error for user {username}: {e}")
         manager.disconnect(user_id)
@@ -1,36 +1,113 @@
 from fastapi import WebSocket
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set
+import logging
+import asyncio
+import os
 import uuid
 import json
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import redis.asyncio as aioredis
+    from redis import RedisError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def encode_message(message: dict) -> str:
+    """Serialize an outgoing WebSocket message (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(message).decode()
+    return json.dumps(message)
+
+
+def decode_message(data: str) -> dict:
+    """Parse an incoming WebSocket message (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Frames buffered per connection before a client counts as too slow to keep
+OUTBOX_SIZE = 256
+
+# Opt-in batching of outgoing frames (clients must accept JSON array frames).
+# Unset: one frame per message. 0: frames already queued for a connection go
+# out together as one array. >0: also wait this many ms for more to arrive.
+_coalesce_ms = os.getenv("WS_COALESCE_MS")
+COALESCE_WINDOW = float(_coalesce_ms) / 1000 if _coalesce_ms else None
+
+# Broadcasts are relayed to the other workers/instances over this Redis
+# Pub/Sub channel when REDIS_URL is set
+PUBSUB_CHANNEL = "chat:broadcast"
+
+# Tags this process's publications so its own subscriber can skip them
+WORKER_ID = uuid.uuid4().hex
+
 
 class ConnectionManager:
-    def __init__(self):
+    """
+    Tracks chat WebSocket connections and fans messages out to them.
+
+    Every connection has a bounded outbox drained by its own writer task, so
+    sending or broadcasting only enqueues: a slow client delays nobody else,
+    and one whose outbox fills up is disconnected.
+
+    With a coalesce window set, each writer sends everything queued for its
+    connection as a single JSON array frame instead of one frame per message.
+
+    Once start_pubsub() has run, broadcasts are delivered to local clients
+    directly and also published to Redis, where every other process's
+    subscriber delivers them to its own clients.
+    """
+
+    def __init__(self, coalesce_window: Optional[float] = COALESCE_WINDOW):
+        # Seconds to wait for more frames before a batched send; None disables batching
+        self.coalesce_window = coalesce_window
+
         # Track active WebSocket connections: {user_id: WebSocket}
         self.active_connections: Dict[str, WebSocket] = {}
 
+        # Outgoing frames and their writer task per connection: {user_id: ...}
+        self._outboxes: Dict[str, asyncio.Queue] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+
         # Track which users are in which channels: {channel_key: Set[user_id]}
         self.channel_users: Dict[str, Set[str]] = {}
 
         # Track typing users per channel: {channel_key: Set[username]}
         self.typing_users: Dict[str, Set[str]] = {}
 
+        # Redis client and subscriber task for cross-process broadcasts
+        self._redis = None
+        self._subscriber: Optional[asyncio.Task] = None
+
     async def connect(self, user_id: str, websocket: WebSocket):
         """Register a new WebSocket connection for a user"""
         await websocket.accept()
+        # A new connection for the same user replaces the old one
+        self._stop_writer(user_id)
         self.active_connections[user_id] = websocket
-        print(
-            f"User {user_id} connected. Total connections: {len(self.active_connections)}"
-        )
+        outbox = asyncio.Queue(maxsize=OUTBOX_SIZE)
+        self._outboxes[user_id] = outbox
+        self._writers[user_id] = asyncio.create_task(self._write_loop(user_id, websocket, outbox))
+        logger.info(f"User {user_id} connected. Total connections: {len(self.active_connections)}")
 
     def disconnect(self, user_id: str):
         """Remove a user's WebSocket connection"""
+        self._stop_writer(user_id)
         if user_id in self.active_connections:
             del self.active_connections[user_id]
-            print(
-                f"User {user_id} disconnected. Total connections: {len(self.active_connections)}"
-            )
+            logger.info(f"User {user_id} disconnected. Total connections: {len(self.active_connections)}")
 
         # Remove user from all channels
         for channel_key in list(self.channel_users.keys()):
@@ -46,14 +123,55 @@ class ConnectionManager:
                 if not self.typing_users[channel_key]:
                     del self.typing_users[channel_key]
 
+    def _stop_writer(self, user_id: str):
+        self._outboxes.pop(user_id, None)
+        writer = self._writers.pop(user_id, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
+    async def _write_loop(self, user_id: str, websocket: WebSocket, outbox: asyncio.Queue):
+        """Send queued frames to one connection until it fails or is replaced"""
+        try:
+            while True:
+                text = await outbox.get()
+                if self.coalesce_window is not None:
+                    text = await self._coalesce(text, outbox)
+                await websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending to user {user_id}: {e}")
+            if self.active_connections.get(user_id) is websocket:
+                self.disconnect(user_id)
+
+    async def _coalesce(self, text: str, outbox: asyncio.Queue) -> str:
+        """Join the frames queued behind `text` into one JSON array frame"""
+        if self.coalesce_window:
+            await asyncio.sleep(self.coalesce_window)
+        if outbox.empty():
+            return text
+        frames = [text]
+        while not outbox.empty():
+            frames.append(outbox.get_nowait())
+        return "[" + ",".join(frames) + "]"
+
+    def _enqueue(self, user_id: str, text: str):
+        outbox = self._outboxes.get(user_id)
+        if outbox is None:
+            return
+        try:
+            outbox.put_nowait(text)
+        except asyncio.QueueFull:
+            logger.warning(f"User {user_id} is not keeping up ({OUTBOX_SIZE} frames queued), disconnecting")
+            websocket = self.active_connections.get(user_id)
+            self.disconnect(user_id)
+            if websocket is not None:
+                # 1013 = try again later; the client's reconnect logic takes over
+                asyncio.create_task(websocket.close(code=1013))
+
     async def send_personal(self, user_id: str, message: dict):
         """Send a message to a specific user"""
-        if user_id in self.active_connections:
-            try:
-                await self.active_connections[user_id].send_text(json.dumps(message))
-            except Exception as e:
-                print(f"Error sending to user {user_id}: {e}")
-                self.disconnect(user_id)
+        self._enqueue(user_id, encode_message(message))
 
     async def broadcast_to_channel(
         self, server_id: str, channel_id: str, message: dict, allowed_users: Set[str]
@@ -67,33 +185,91 @@ class ConnectionManager:
             message: The message to send
             allowed_users: Set of user_ids who are members of the server
         """
-        # Send to all connected users who are members of the server
-        disconnected_users = []
-        for user_id, websocket in self.active_connections.items():
-            if user_id in allowed_users:
-                try:
-                    await websocket.send_text(json.dumps(message))
-                except Exception as e:
-                    print(f"Error broadcasting to user {user_id}: {e}")
-                    disconnected_users.append(user_id)
-
-        # Clean up disconnected users
-        for user_id in disconnected_users:
-            self.disconnect(user_id)
+        text = encode_message(message)
+        self._fan_out(self._local_recipients(allowed_users), text)
+        await self._publish(list(allowed_users), text)
 
     async def broadcast_to_all(self, message: dict):
         """Broadcast a message to all connected users"""
-        disconnected_users = []
-        for user_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                print(f"Error broadcasting to user {user_id}: {e}")
-                disconnected_users.append(user_id)
-
-        # Clean up disconnected users
-        for user_id in disconnected_users:
-            self.disconnect(user_id)
+        text = encode_message(message)
+        self._fan_out(list(self._outboxes), text)
+        await self._publish(None, text)
+
+    def _local_recipients(self, allowed_users) -> List[str]:
+        """Connected users who are members of the server"""
+        # Walk whichever of the two collections is smaller
+        if len(allowed_users) < len(self._outboxes):
+            return [user_id for user_id in allowed_users if user_id in self._outboxes]
+        return [user_id for user_id in self._outboxes if user_id in allowed_users]
+
+    def _fan_out(self, user_ids: List[str], text: str):
+        """Queue an already serialized message for each user"""
+        for user_id in user_ids:
+            self._enqueue(user_id, text)
+
+    # ==================== CROSS-PROCESS BROADCASTS ====================
+
+    async def start_pubsub(self, redis_url: Optional[str] = None):
+        """Relay broadcasts through Redis Pub/Sub (no-op without REDIS_URL / redis)"""
+        # Read at startup rather than import, after main.py has loaded .env
+        redis_url = redis_url or os.getenv("REDIS_URL")
+        if not redis_url or self._subscriber is not None:
+            return
+        if not REDIS_AVAILABLE:
+            logger.warning("⚠️  REDIS_URL is set but redis is not installed; chat broadcasts stay in-process")
+            return
+        self._redis = aioredis.Redis.from_url(redis_url)
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(PUBSUB_CHANNEL)
+        except (RedisError, OSError) as e:
+            # Redis down at boot shouldn't take the API with it
+            logger.error(f"❌ Could not subscribe to Redis channel {PUBSUB_CHANNEL}; chat broadcasts stay in-process: {e}")
+            await pubsub.aclose()
+            await self._redis.aclose()
+            self._redis = None
+            return
+        self._subscriber = asyncio.create_task(self._listen(pubsub))
+        logger.info(f"✅ Chat broadcasts relayed via Redis channel {PUBSUB_CHANNEL}")
+
+    async def stop_pubsub(self):
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            self._subscriber = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _publish(self, user_ids: Optional[List[str]], text: str):
+        if self._redis is None:
+            return
+        # Envelope line, then the message exactly as local clients received it
+        envelope = encode_message({"origin": WORKER_ID, "users": user_ids})
+        try:
+            await self._redis.publish(PUBSUB_CHANNEL, envelope + "\n" + text)
+        except RedisError as e:
+            logger.error(f"Error publishing chat broadcast: {e}")
+
+    async def _listen(self, pubsub):
+        """Deliver broadcasts published by other processes to local clients"""
+        try:
+            async for item in pubsub.listen():
+                try:
+                    envelope, text = item["data"].decode().split("\n", 1)
+                    header = decode_message(envelope)
+                    if header["origin"] == WORKER_ID:
+                        continue
+                    user_ids = header["users"]
+                    recipients = list(self._outboxes) if user_ids is None else self._local_recipients(set(user_ids))
+                    self._fan_out(recipients, text)
+                except Exception as e:
+                    logger.error(f"Error relaying chat broadcast: {e}")
+        except asyncio.CancelledError:
+            await pubsub.aclose()
+            raise
+        except RedisError as e:
+            logger.warning(f"Chat broadcast subscriber stopped: {e}")
+            self._subscriber = None
 
     def add_typing_user(self, channel_key: str, username: str):
         """Add a user to the typing indicator for a channel"""
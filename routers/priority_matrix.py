@@ -5,6 +5,7 @@ Handles Eisenhower Matrix tasks using Firestore for real-time sync.
 """
 
 from typing import Optional, List
+import logging
 import uuid
 from fastapi import APIRouter, HTTPException, Response, status
 from datetime import date, datetime
@@ -14,6 +15,8 @@ from model import PriorityMatrix, TaskData, DeleteTaskData, TaskStatus, Quadrant
 from firebase_db import get_firestore
 from utils import TokenDep, get_current_user
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/priority_matrix", tags=["PriorityMatrix"])
 
 
@@ -36,7 +39,7 @@ def _task_dict_to_model(task_id: str, task_dict: dict) -> PriorityMatrix:
     status_code=status.HTTP_201_CREATED,
     response_model=PriorityMatrix,
 )
-async def add_task(token_data: TokenDep, data: TaskData):
+def add_task(token_data: TokenDep, data: TaskData):
     """Create a new priority matrix task"""
     try:
         db = get_firestore()
@@ -63,7 +66,7 @@ async def add_task(token_data: TokenDep, data: TaskData):
         return _task_dict_to_model(task_id, task_data)
         
     except Exception as e:
-        print(f"Database error in add_task: {e}")
+        logger.error(f"Database error in add_task: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal Server Error: {e}",
@@ -71,10 +74,10 @@ async def add_task(token_data: TokenDep, data: TaskData):
 
 
 @router.get("", response_model=List[PriorityMatrix])
-async def get_priority_matrix(
+def get_priority_matrix(
     token_data: TokenDep,
-    day: Optional[str] = None,
-    due: Optional[str] = None
+    day: Optional[date] = None,
+    due: Optional[date] = None
 ):
     """
     Get priority matrix tasks for the user
@@ -92,15 +95,11 @@ async def get_priority_matrix(
         query = tasks_ref.where('user_id', '==', token_data.user_id)
         
         # Apply date filters
+        # day / due are parsed by FastAPI; malformed dates are rejected with 422
         if due is not None:
-            due_parts = due.split("-")
-            due_dt = date(int(due_parts[0]), int(due_parts[1]), int(due_parts[2]))
-            due_str = due_dt.isoformat()
-            query = query.where('due_date', '==', due_str)
+            query = query.where('due_date', '==', due.isoformat())
         elif day is not None:
-            day_parts = day.split("-")
-            day_dt = date(int(day_parts[0]), int(day_parts[1]), int(day_parts[2]))
-            day_str = day_dt.isoformat()
+            day_str = day.isoformat()
             # Filter by created_at date (Firestore stores as ISO string)
             # Note: This is a simple string comparison, may need refinement
             query = query.where('created_at', '>=', f"{day_str}T00:00:00")
@@ -127,7 +126,7 @@ async def get_priority_matrix(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_task(token_data: TokenDep, task_data: DeleteTaskData):
+def delete_task(token_data: TokenDep, task_data: DeleteTaskData):
     """Delete a priority matrix task"""
     try:
         try:
@@ -140,7 +139,8 @@ async def delete_task(token_data: TokenDep, task_data: DeleteTaskData):
         
         db = get_firestore()
         task_ref = db.collection('priority_matrix_tasks').document(task_data.id)
-        task_doc = task_ref.get()
+        # Only the owner is needed to authorize the delete
+        task_doc = task_ref.get(field_paths=['user_id'])
         
         if not task_doc.exists:
             raise HTTPException(
@@ -169,7 +169,7 @@ async def delete_task(token_data: TokenDep, task_data: DeleteTaskData):
 
 
 @router.patch("", response_model=PriorityMatrix)
-async def update_task(token_data: TokenDep, changed_data: TaskData):
+def update_task(token_data: TokenDep, changed_data: TaskData):
     """Update a priority matrix task"""
     try:
         if not changed_data.id:
@@ -220,14 +220,12 @@ async def update_task(token_data: TokenDep, changed_data: TaskData):
         if changed_data.due_date is not None:
             update_data["due_date"] = changed_data.due_date.isoformat()
         
-        # Update document
+        # Update document; the response is the document we read plus our
+        # changes, so there's no second read
         task_ref.update(update_data)
+        task_dict.update(update_data)
         
-        # Get updated document
-        updated_doc = task_ref.get()
-        updated_dict = updated_doc.to_dict()
-        
-        return _task_dict_to_model(changed_data.id, updated_dict)
+        return _task_dict_to_model(changed_data.id, task_dict)
         
     except HTTPException:
         raise
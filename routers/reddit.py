@@ -4,11 +4,14 @@ Reddit Router - Firebase Version
 Handles Reddit community features using Firebase Firestore for real-time sync.
 """
 
-from fastapi import APIRouter, Depends, status, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, status, HTTPException, Query, Request, Response
 from datetime import datetime
 from typing import List, Optional
+import asyncio
 import uuid
+from cachetools import TTLCache
 from google.cloud.firestore_v1 import SERVER_TIMESTAMP
+from pydantic import TypeAdapter
 
 from model import (
     CountryResponse, PostCreate, PostResponse,
@@ -81,42 +84,63 @@ def _get_usernames_batch(db, user_ids: List[str]) -> dict:
 
 # ==================== COUNTRIES ====================
 
+# Active countries only change when the seed scripts run, yet every community
+# page load fetches them. Keep the serialized list for a few minutes.
+COUNTRIES_CACHE_TTL = 300
+_countries_cache = TTLCache(maxsize=1, ttl=COUNTRIES_CACHE_TTL)
+_countries_lock = asyncio.Lock()
+_countries_adapter = TypeAdapter(List[CountryResponse])
+
+
+def _load_active_countries() -> List[CountryResponse]:
+    db = get_firestore()
+    countries_ref = db.collection('countries')
+    # ONLY filter by is_active to avoid composite index requirement
+    query = countries_ref.where('is_active', '==', True)
+    all_docs = [(doc, doc.to_dict()) for doc in query.stream()]
+    
+    # Sort by name in Python
+    all_docs.sort(key=lambda x: x[1].get('name', ''))
+    
+    countries = []
+    for doc, data in all_docs:
+        # Handle timestamp conversion
+        created_at = data.get('created_at')
+        if hasattr(created_at, 'timestamp'):
+            created_at = datetime.fromtimestamp(created_at.timestamp())
+        elif isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        elif created_at is None:
+            created_at = datetime.utcnow()
+        
+        countries.append(CountryResponse(
+            id=doc.id,
+            iso_code=data.get('iso_code', ''),
+            name=data.get('name', ''),
+            flag_emoji=data.get('flag_emoji'),
+            description=data.get('description'),
+            is_active=data.get('is_active', True),
+            created_at=created_at
+        ))
+    return countries
+
+
 @router.get("/countries", response_model=List[CountryResponse])
 async def get_countries():
     """Get all active countries"""
     try:
-        db = get_firestore()
-        countries_ref = db.collection('countries')
-        # ONLY filter by is_active to avoid composite index requirement
-        query = countries_ref.where('is_active', '==', True)
-        all_docs = list(query.stream())
-        
-        # Sort by name in Python
-        all_docs.sort(key=lambda x: x.to_dict().get('name', ''))
-        
-        countries = []
-        for doc in all_docs:
-            data = doc.to_dict()
-            # Handle timestamp conversion
-            created_at = data.get('created_at')
-            if hasattr(created_at, 'timestamp'):
-                created_at = datetime.fromtimestamp(created_at.timestamp())
-            elif isinstance(created_at, str):
-                created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-            elif created_at is None:
-                created_at = datetime.utcnow()
-            
-            countries.append(CountryResponse(
-                id=doc.id,
-                iso_code=data.get('iso_code', ''),
-                name=data.get('name', ''),
-                flag_emoji=data.get('flag_emoji'),
-                description=data.get('description'),
-                is_active=data.get('is_active', True),
-                created_at=created_at
-            ))
-        
-        return countries
+        payload = _countries_cache.get("active")
+        if payload is None:
+            # One Firestore read per expiry, however many requests are waiting
+            async with _countries_lock:
+                payload = _countries_cache.get("active")
+                if payload is None:
+                    # Blocking Firestore stream: read it in a worker thread
+                    countries = await asyncio.to_thread(_load_active_countries)
+                    payload = _countries_adapter.dump_json(countries)
+                    _countries_cache["active"] = payload
+        # Already serialized: skip the response_model validation / encoding pass
+        return Response(content=payload, media_type="application/json")
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -362,24 +386,25 @@ async def get_posts(
         query = posts_ref.where('country_id', '==', country_id)
         
         # Fetch all posts for this country
-        all_docs = list(query.stream())
+        # to_dict() deep-copies the snapshot on every call; convert each document once
+        all_docs = [(doc, doc.to_dict()) for doc in query.stream()]
         
         # Filter is_hidden == False in Python
-        visible_posts = [doc for doc in all_docs if not doc.to_dict().get('is_hidden', False)]
+        visible_posts = [(doc, data) for doc, data in all_docs if not data.get('is_hidden', False)]
         
         # Sort in Python based on sort parameter
         if sort == "new":
             # Sort by created_at descending
             visible_posts.sort(
-                key=lambda x: x.to_dict().get('created_at', datetime.min),
+                key=lambda x: x[1].get('created_at', datetime.min),
                 reverse=True
             )
         elif sort == "top":
             # Sort by score descending, then created_at descending
             visible_posts.sort(
                 key=lambda x: (
-                    x.to_dict().get('score', 0),
-                    x.to_dict().get('created_at', datetime.min)
+                    x[1].get('score', 0),
+                    x[1].get('created_at', datetime.min)
                 ),
                 reverse=True
             )
@@ -387,8 +412,8 @@ async def get_posts(
             # Sort by score descending, then created_at descending (same as top for now)
             visible_posts.sort(
                 key=lambda x: (
-                    x.to_dict().get('score', 0),
-                    x.to_dict().get('created_at', datetime.min)
+                    x[1].get('score', 0),
+                    x[1].get('created_at', datetime.min)
                 ),
                 reverse=True
             )
@@ -400,7 +425,7 @@ async def get_posts(
         user_votes = {}
         if token_data:
             votes_ref = db.collection('reddit_votes')
-            post_ids = [doc.id for doc in posts_docs]
+            post_ids = [doc.id for doc, _ in posts_docs]
             for post_id in post_ids:
                 vote_query = votes_ref.where('user_id', '==', token_data.user_id)\
                                       .where('post_id', '==', post_id)\
@@ -411,13 +436,12 @@ async def get_posts(
                     user_votes[post_id] = vote_docs[0].to_dict().get('vote_type', 0)
         
         # Get usernames
-        user_ids = list(set([doc.to_dict().get('user_id') for doc in posts_docs]))
+        user_ids = list(set([data.get('user_id') for _, data in posts_docs]))
         username_map = _get_usernames_batch(db, user_ids)
         
         # Build response
         posts = []
-        for doc in posts_docs:
-            data = doc.to_dict()
+        for doc, data in posts_docs:
             created_at = data.get('created_at')
             if isinstance(created_at, str):
                 created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
@@ -645,16 +669,16 @@ async def get_comments(post_id: str, request: Request):
         comments_ref = db.collection('reddit_comments')
         query = comments_ref.where('post_id', '==', post_id)
         
-        all_comment_docs = list(query.stream())
+        all_comment_docs = [(doc, doc.to_dict()) for doc in query.stream()]
         
         # Filter is_hidden == False in Python
-        visible_comments = [doc for doc in all_comment_docs if not doc.to_dict().get('is_hidden', False)]
+        visible_comments = [(doc, data) for doc, data in all_comment_docs if not data.get('is_hidden', False)]
         
         # Sort by path and created_at in Python
         visible_comments.sort(
             key=lambda x: (
-                x.to_dict().get('path', ''),
-                x.to_dict().get('created_at', datetime.min)
+                x[1].get('path', ''),
+                x[1].get('created_at', datetime.min)
             )
         )
         
@@ -664,7 +688,7 @@ async def get_comments(post_id: str, request: Request):
         user_votes = {}
         if token_data:
             votes_ref = db.collection('reddit_votes')
-            comment_ids = [doc.id for doc in comment_docs]
+            comment_ids = [doc.id for doc, _ in comment_docs]
             for comment_id in comment_ids:
                 vote_query = votes_ref.where('user_id', '==', token_data.user_id)\
                                       .where('comment_id', '==', comment_id)\
@@ -675,13 +699,12 @@ async def get_comments(post_id: str, request: Request):
                     user_votes[comment_id] = vote_docs[0].to_dict().get('vote_type', 0)
         
         # Get usernames
-        user_ids = list(set([doc.to_dict().get('user_id') for doc in comment_docs]))
+        user_ids = list(set([data.get('user_id') for _, data in comment_docs]))
         username_map = _get_usernames_batch(db, user_ids)
         
         # Build response
         comments = []
-        for doc in comment_docs:
-            data = doc.to_dict()
+        for doc, data in comment_docs:
             created_at = data.get('created_at')
             if isinstance(created_at, str):
                 created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
@@ -751,6 +774,8 @@ async def vote_on_post(post_id: str, vote_data: VoteRequest, token_data: TokenDe
                               .where('comment_id', '==', None)\
                               .limit(1)
         existing_votes = list(vote_query.stream())
+        # One timestamp for the vote and the score update
+        now = datetime.utcnow().isoformat()
         
         if existing_votes:
             # Update existing vote
@@ -767,7 +792,7 @@ async def vote_on_post(post_id: str, vote_data: VoteRequest, token_data: TokenDe
                 new_score = current_score - old_vote_type + vote_data.vote_type
                 votes_ref.document(existing_vote_doc.id).update({
                     'vote_type': vote_data.vote_type,
-                    'updated_at': datetime.utcnow().isoformat()
+                    'updated_at': now
                 })
         else:
             # Create new vote
@@ -777,13 +802,13 @@ async def vote_on_post(post_id: str, vote_data: VoteRequest, token_data: TokenDe
                 'post_id': post_id,
                 'comment_id': None,
                 'vote_type': vote_data.vote_type,
-                'created_at': datetime.utcnow().isoformat(),
+                'created_at': now,
             })
         
         # Update post score
         post_ref.update({
             'score': new_score,
-            'updated_at': datetime.utcnow().isoformat()
+            'updated_at': now
         })
         
         return {"message": "Vote updated", "score": new_score}
@@ -822,6 +847,8 @@ async def vote_on_comment(comment_id: str, vote_data: VoteRequest, token_data: T
                               .where('post_id', '==', None)\
                               .limit(1)
         existing_votes = list(vote_query.stream())
+        # One timestamp for the vote and the score update
+        now = datetime.utcnow().isoformat()
         
         if existing_votes:
             # Update existing vote
@@ -838,7 +865,7 @@ async def vote_on_comment(comment_id: str, vote_data: VoteRequest, token_data: T
                 new_score = current_score - old_vote_type + vote_data.vote_type
                 votes_ref.document(existing_vote_doc.id).update({
                     'vote_type': vote_data.vote_type,
-                    'updated_at': datetime.utcnow().isoformat()
+                    'updated_at': now
                 })
         else:
             # Create new vote
@@ -848,13 +875,13 @@ async def vote_on_comment(comment_id: str, vote_data: VoteRequest, token_data: T
                 'comment_id': comment_id,
                 'post_id': None,
                 'vote_type': vote_data.vote_type,
-                'created_at': datetime.utcnow().isoformat(),
+                'created_at': now,
             })
         
         # Update comment score
         comment_ref.update({
             'score': new_score,
-            'updated_at': datetime.utcnow().isoformat()
+            'updated_at': now
         })
         
         return {"message": "Vote updated", "score": new_score}
@@ -1051,14 +1078,14 @@ async def get_user_posts(
         posts_ref = db.collection('reddit_posts')
         query = posts_ref.where('user_id', '==', user_id)
         
-        all_docs = list(query.stream())
+        all_docs = [(doc, doc.to_dict()) for doc in query.stream()]
         
         # Filter is_hidden == False in Python
-        visible_posts = [doc for doc in all_docs if not doc.to_dict().get('is_hidden', False)]
+        visible_posts = [(doc, data) for doc, data in all_docs if not data.get('is_hidden', False)]
         
         # Sort by created_at descending in Python
         visible_posts.sort(
-            key=lambda x: x.to_dict().get('created_at', datetime.min),
+            key=lambda x: x[1].get('created_at', datetime.min),
             reverse=True
         )
         
@@ -1066,7 +1093,7 @@ async def get_user_posts(
         posts_docs = visible_posts[skip:skip+limit]
         
         # Get countries
-        country_ids = list(set([doc.to_dict().get('country_id') for doc in posts_docs]))
+        country_ids = list(set([data.get('country_id') for _, data in posts_docs]))
         country_map = {}
         for country_id in country_ids:
             country_ref = db.collection('countries').document(country_id)
@@ -1080,7 +1107,7 @@ async def get_user_posts(
         user_votes = {}
         if token_data:
             votes_ref = db.collection('reddit_votes')
-            post_ids = [doc.id for doc in posts_docs]
+            post_ids = [doc.id for doc, _ in posts_docs]
             for post_id in post_ids:
                 vote_query = votes_ref.where('user_id', '==', token_data.user_id)\
                                       .where('post_id', '==', post_id)\
@@ -1091,13 +1118,12 @@ async def get_user_posts(
                     user_votes[post_id] = vote_docs[0].to_dict().get('vote_type', 0)
         
         # Get usernames
-        user_ids = list(set([doc.to_dict().get('user_id') for doc in posts_docs]))
+        user_ids = list(set([data.get('user_id') for _, data in posts_docs]))
         username_map = _get_usernames_batch(db, user_ids)
         
         # Build response
         posts = []
-        for doc in posts_docs:
-            data = doc.to_dict()
+        for doc, data in posts_docs:
             created_at = data.get('created_at')
             if isinstance(created_at, str):
                 created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
@@ -1158,14 +1184,14 @@ async def get_user_comments(
         comments_ref = db.collection('reddit_comments')
         query = comments_ref.where('user_id', '==', user_id)
         
-        all_docs = list(query.stream())
+        all_docs = [(doc, doc.to_dict()) for doc in query.stream()]
         
         # Filter is_hidden == False in Python
-        visible_comments = [doc for doc in all_docs if not doc.to_dict().get('is_hidden', False)]
+        visible_comments = [(doc, data) for doc, data in all_docs if not data.get('is_hidden', False)]
         
         # Sort by created_at descending in Python
         visible_comments.sort(
-            key=lambda x: x.to_dict().get('created_at', datetime.min),
+            key=lambda x: x[1].get('created_at', datetime.min),
             reverse=True
         )
         
@@ -1176,7 +1202,7 @@ async def get_user_comments(
         user_votes = {}
         if token_data:
             votes_ref = db.collection('reddit_votes')
-            comment_ids = [doc.id for doc in comment_docs]
+            comment_ids = [doc.id for doc, _ in comment_docs]
             for comment_id in comment_ids:
                 vote_query = votes_ref.where('user_id', '==', token_data.user_id)\
                                       .where('comment_id', '==', comment_id)\
@@ -1187,13 +1213,12 @@ async def get_user_comments(
                     user_votes[comment_id] = vote_docs[0].to_dict().get('vote_type', 0)
         
         # Get usernames
-        user_ids = list(set([doc.to_dict().get('user_id') for doc in comment_docs]))
+        user_ids = list(set([data.get('user_id') for _, data in comment_docs]))
         username_map = _get_usernames_batch(db, user_ids)
         
         # Build response
         comments = []
-        for doc in comment_docs:
-            data = doc.to_dict()
+        for doc, data in comment_docs:
             created_at = data.get('created_at')
             if isinstance(created_at, str):
                 created_at = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
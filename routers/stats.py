@@ -5,21 +5,15 @@ All stats tracking now uses Firebase Firestore
 
 from fastapi import APIRouter, status, HTTPException
 from datetime import datetime, timezone
-from pydantic import BaseModel
 from firebase_db import get_firestore
+import logging
 import uuid
 
+from model import SoundUsageLogInput
 from utils import TokenDep
 
 
-# Pydantic models for input validation
-class SoundUsageLogInput(BaseModel):
-    sound_type: str
-    sound_name: str
-
-class PomodoroSessionInput(BaseModel):
-    pass
-
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Stats"])
 
@@ -60,7 +54,7 @@ async def start_sound_session(
             "started_at": now.isoformat(),
         }
     except Exception as e:
-        print(f"❌ Error starting sound session: {e}")
+        logger.error(f"❌ Error starting sound session: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to start sound session: {str(e)}"
@@ -125,7 +119,7 @@ async def end_sound_session(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error ending sound session: {e}")
+        logger.error(f"❌ Error ending sound session: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to end sound session: {str(e)}"
@@ -172,19 +166,19 @@ async def get_sound_preferences(
                     continue
                 
                 if start_datetime <= session_datetime < end_datetime:
-                    sound_sessions.append(doc)
+                    sound_sessions.append(data)
         
         # Analyze sound types
-        ambient_count = sum(1 for doc in sound_sessions if doc.to_dict().get('sound_type') == "ambient")
-        noise_count = sum(1 for doc in sound_sessions if doc.to_dict().get('sound_type') == "noise")
+        ambient_count = sum(1 for data in sound_sessions if data.get('sound_type') == "ambient")
+        noise_count = sum(1 for data in sound_sessions if data.get('sound_type') == "noise")
         total_count = len(sound_sessions)
         
         ambient_percentage = (ambient_count / total_count * 100) if total_count > 0 else 50
         
         # Find most used sound
         sound_counts = {}
-        for doc in sound_sessions:
-            sound_name = doc.to_dict().get('sound_name', 'FOREST')
+        for data in sound_sessions:
+            sound_name = data.get('sound_name', 'FOREST')
             sound_counts[sound_name] = sound_counts.get(sound_name, 0) + 1
         
         most_used_sound = max(sound_counts, key=sound_counts.get) if sound_counts else "FOREST"
@@ -200,7 +194,7 @@ async def get_sound_preferences(
             }
         }
     except Exception as e:
-        print(f"❌ Error getting sound preferences: {e}")
+        logger.error(f"❌ Error getting sound preferences: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get sound preferences: {str(e)}"
@@ -239,7 +233,7 @@ async def start_pomodoro_session(token_data: TokenDep):
             "started_at": now.isoformat(),
         }
     except Exception as e:
-        print(f"❌ Error starting pomodoro session: {e}")
+        logger.error(f"❌ Error starting pomodoro session: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to start pomodoro session: {str(e)}"
@@ -307,7 +301,7 @@ async def end_pomodoro_session(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error ending pomodoro session: {e}")
+        logger.error(f"❌ Error ending pomodoro session: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to end pomodoro session: {str(e)}"
@@ -354,15 +348,14 @@ async def get_pomodoro_analytics(
                     continue
                 
                 if start_datetime <= session_datetime < end_datetime:
-                    pomodoro_sessions.append(doc)
+                    pomodoro_sessions.append(data)
         
         # Calculate statistics
         total_duration_seconds = 0
         total_cycles = 0
         study_days = set()
         
-        for doc in pomodoro_sessions:
-            data = doc.to_dict()
+        for data in pomodoro_sessions:
             duration = data.get('duration_seconds') or 0
             total_duration_seconds += duration
             total_cycles += data.get('cycles_completed', 0)
@@ -390,7 +383,7 @@ async def get_pomodoro_analytics(
             }
         }
     except Exception as e:
-        print(f"❌ Error getting pomodoro analytics: {e}")
+        logger.error(f"❌ Error getting pomodoro analytics: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get pomodoro analytics: {str(e)}"
@@ -420,7 +413,7 @@ async def get_monthly_overview(
             "sound_sessions": 0,
         }
     except Exception as e:
-        print(f"❌ Error in monthly overview: {e}")
+        logger.error(f"❌ Error in monthly overview: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get monthly overview: {str(e)}"
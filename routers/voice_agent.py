@@ -16,6 +16,23 @@ import io
 from google.genai.types import GenerateContentConfig
 from google.cloud import speech_v1
 
+# Every audio chunk is a JSON frame in both directions; orjson encodes and
+# parses them several times faster than the stdlib (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    def json_dumps(payload) -> str:
+        return orjson.dumps(payload).decode()
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    json_loads = orjson.loads
+else:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
 load_dotenv()
 
 # Configure logging
@@ -31,6 +48,11 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["VoiceAgent"])
 
+
+async def send_json(websocket: WebSocket, payload: dict):
+    """WebSocket.send_json, serialized with json_dumps"""
+    await websocket.send_text(json_dumps(payload))
+
 # Initialize Speech-to-Text client
 try:
     stt_client = speech_v1.SpeechClient()
@@ -255,17 +277,18 @@ class AwaazConnection:
             }
 
             logger.info(f"📤 AwaazConnection: Sending setup message with voice: {self.config.get('voice', 'Puck')}")
-            logger.info(f"📤 AwaazConnection: System prompt: {self.config.get('systemPrompt', 'You are a helpful assistant.')[:100]}...")
-            logger.info(f"📤 AwaazConnection: Setup message: {json.dumps(setup_message, indent=2)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("📤 AwaazConnection: System prompt: %.100s...", self.config.get('systemPrompt', 'You are a helpful assistant.'))
+                logger.info("📤 AwaazConnection: Setup message: %s", json.dumps(setup_message, indent=2))
 
-            await self.ws.send(json.dumps(setup_message))
+            await self.ws.send(json_dumps(setup_message))
             logger.info("✅ AwaazConnection: Setup message sent, waiting for response...")
             
             # Wait for setup completion with timeout
             try:
                 logger.info("⏳ AwaazConnection: Waiting for setup response (10s timeout)...")
                 setup_response = await asyncio.wait_for(self.ws.recv(), timeout=10.0)
-                logger.info(f"✅ AwaazConnection: Setup response received: {setup_response[:200]}...")
+                logger.info("✅ AwaazConnection: Setup response received: %.200s...", setup_response)
                 logger.info(f"✅ AwaazConnection: Full setup response: {setup_response}")
                 
                 # Connection established successfully
@@ -293,51 +316,12 @@ class AwaazConnection:
     async def send_audio(self, audio_data: str, sample_rate: int = 16000):
         """Send audio data to Awaaz with voice activity detection"""
         try:
-            # Decode base64 audio data
-            audio_bytes = base64.b64decode(audio_data)
-            
-            # Only process if we have valid audio data
-            if len(audio_bytes) == 0:
-                logger.warning("Empty audio data, skipping")
-                return
-            
-            # Calculate audio level for debugging (only log occasionally)
-            audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
-            rms = np.sqrt(np.mean(audio_np.astype(np.float32) ** 2))
-            # Only log audio level every 100th chunk to reduce spam
+            # Count chunks so per-chunk debug logging can be sampled
             if hasattr(self, '_audio_chunk_count'):
                 self._audio_chunk_count += 1
             else:
                 self._audio_chunk_count = 1
             
-            if self._audio_chunk_count % 100 == 0:
-                logger.debug(f"Audio RMS level: {rms:.6f}, samples: {len(audio_np)}, sample_rate: {sample_rate}")
-            
-            # Apply Voice Activity Detection (if enabled)
-            if self.vad_enabled:
-                try:
-                    is_speech = self.vad.is_speech(audio_bytes, sample_rate)
-                    # Only log VAD results occasionally to reduce spam
-                    if self._audio_chunk_count % 50 == 0:
-                        logger.debug(f"VAD result: is_speech={is_speech}")
-                    if not is_speech:
-                        # Send silence instead of actual audio when no speech is detected
-                        silence_data = b'\x00' * len(audio_bytes)
-                        audio_data = base64.b64encode(silence_data).decode("utf-8")
-                        if self._audio_chunk_count % 50 == 0:
-                            logger.debug("VAD: No speech detected, sending silence")
-                    else:
-                        if self._audio_chunk_count % 50 == 0:
-                            logger.debug("VAD: Speech detected, sending audio")
-                except Exception as vad_error:
-                    logger.error(f"VAD error: {vad_error}")
-                    # If VAD fails, assume it's speech to avoid losing audio
-                    logger.warning("VAD failed, assuming speech")
-            else:
-                # Only log occasionally when VAD is disabled
-                if self._audio_chunk_count % 100 == 0:
-                    logger.debug("VAD disabled - sending all audio")
-            
             # Only send audio if not currently playing (unless interruptions are allowed)
             allow_interruptions = self.config.get("allow_interruptions", False)
             should_process = (not self.is_playing) or (self.is_playing and allow_interruptions)
@@ -345,55 +329,110 @@ class AwaazConnection:
             if self._audio_chunk_count % 100 == 0:
                 logger.debug(f"Should process audio: {should_process} (is_playing: {self.is_playing}, allow_interruptions: {allow_interruptions})")
             
-            if should_process:
-                # Convert 16kHz input to 24kHz for Gemini Live API
-                if sample_rate == 16000:
-                    # Resample audio from 16kHz to 24kHz
-                    audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
-                    audio_float = audio_np.astype(np.float32) / 32768.0
-                    
-                    logger.debug(f"Resampling from 16kHz to 24kHz: {len(audio_float)} -> {int(len(audio_float) * 1.5)} samples")
-                    
-                    # Resample to 24kHz
-                    resampled_audio = self.vad.resample_audio(audio_float, 16000, 24000)
-                    
-                    # Convert back to 16-bit PCM
-                    resampled_int16 = (resampled_audio * 32768).astype(np.int16)
-                    audio_data = base64.b64encode(resampled_int16.tobytes()).decode("utf-8")
-                    sample_rate = 24000
-                    
-                    # Only log resampling info occasionally
-                    if self._audio_chunk_count % 100 == 0:
-                        logger.debug(f"Resampled audio: {len(resampled_int16)} samples at {sample_rate}Hz")
-                
-                realtime_input_msg = {
-                    "realtimeInput": {
-                        "mediaChunks": [
-                            {
-                                "data": audio_data,
-                                "mimeType": f"audio/pcm;rate={sample_rate}"
-                            }
-                        ]
-                    }
-                }
-                # Only log sending info occasionally
-                if self._audio_chunk_count % 100 == 0:
-                    logger.debug(f"Sending to Gemini API: {len(audio_data)} chars")
-                
-                await self.ws.send(json.dumps(realtime_input_msg))
-                # Only log success occasionally
-                if self._audio_chunk_count % 100 == 0:
-                    logger.info("Audio sent successfully to Gemini API")
-                
-            else:
+            if not should_process:
                 # Only log skipping occasionally
                 if self._audio_chunk_count % 100 == 0:
                     logger.debug("Skipping audio - currently playing and interruptions not allowed")
+                return
+            
+            # VAD inference and resampling are CPU-bound; run them in a worker
+            # thread so other connections' frames keep flowing meanwhile
+            processed = await asyncio.to_thread(self._prepare_audio, audio_data, sample_rate)
+            if processed is None:
+                return
+            audio_data, sample_rate = processed
+            
+            realtime_input_msg = {
+                "realtimeInput": {
+                    "mediaChunks": [
+                        {
+                            "data": audio_data,
+                            "mimeType": f"audio/pcm;rate={sample_rate}"
+                        }
+                    ]
+                }
+            }
+            # Only log sending info occasionally
+            if self._audio_chunk_count % 100 == 0:
+                logger.debug("Sending to Gemini API: %d chars", len(audio_data))
+            
+            await self.ws.send(json_dumps(realtime_input_msg))
+            # Only log success occasionally
+            if self._audio_chunk_count % 100 == 0:
+                logger.info("Audio sent successfully to Gemini API")
         except Exception as e:
             logger.error(f"Error processing audio: {e}")
             import traceback
             traceback.print_exc()
 
+    def _prepare_audio(self, audio_data: str, sample_rate: int):
+        """
+        Decode one base64 PCM chunk, apply VAD and resample 16kHz input to 24kHz.
+
+        Blocking; called from a worker thread by send_audio. Returns the
+        base64 payload and its sample rate, or None for an empty chunk.
+        """
+        # Decode base64 audio data
+        audio_bytes = base64.b64decode(audio_data)
+        
+        # Only process if we have valid audio data
+        if len(audio_bytes) == 0:
+            logger.warning("Empty audio data, skipping")
+            return None
+        
+        # Calculate audio level for debugging (only log occasionally)
+        if self._audio_chunk_count % 100 == 0 and logger.isEnabledFor(logging.DEBUG):
+            audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
+            rms = np.sqrt(np.mean(audio_np.astype(np.float32) ** 2))
+            logger.debug("Audio RMS level: %.6f, samples: %d, sample_rate: %s", rms, len(audio_np), sample_rate)
+        
+        # Apply Voice Activity Detection (if enabled)
+        if self.vad_enabled:
+            try:
+                is_speech = self.vad.is_speech(audio_bytes, sample_rate)
+                # Only log VAD results occasionally to reduce spam
+                if self._audio_chunk_count % 50 == 0:
+                    logger.debug(f"VAD result: is_speech={is_speech}")
+                if not is_speech:
+                    # Send silence instead of actual audio when no speech is detected
+                    silence_data = b'\x00' * len(audio_bytes)
+                    audio_data = base64.b64encode(silence_data).decode("utf-8")
+                    if self._audio_chunk_count % 50 == 0:
+                        logger.debug("VAD: No speech detected, sending silence")
+                else:
+                    if self._audio_chunk_count % 50 == 0:
+                        logger.debug("VAD: Speech detected, sending audio")
+            except Exception as vad_error:
+                logger.error(f"VAD error: {vad_error}")
+                # If VAD fails, assume it's speech to avoid losing audio
+                logger.warning("VAD failed, assuming speech")
+        else:
+            # Only log occasionally when VAD is disabled
+            if self._audio_chunk_count % 100 == 0:
+                logger.debug("VAD disabled - sending all audio")
+        
+        # Convert 16kHz input to 24kHz for Gemini Live API
+        if sample_rate == 16000:
+            # Resample audio from 16kHz to 24kHz
+            audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
+            audio_float = audio_np.astype(np.float32) / 32768.0
+            
+            logger.debug("Resampling from 16kHz to 24kHz: %d -> %d samples", len(audio_float), int(len(audio_float) * 1.5))
+            
+            # Resample to 24kHz
+            resampled_audio = self.vad.resample_audio(audio_float, 16000, 24000)
+            
+            # Convert back to 16-bit PCM
+            resampled_int16 = (resampled_audio * 32768).astype(np.int16)
+            audio_data = base64.b64encode(resampled_int16.tobytes()).decode("utf-8")
+            sample_rate = 24000
+            
+            # Only log resampling info occasionally
+            if self._audio_chunk_count % 100 == 0:
+                logger.debug("Resampled audio: %d samples at %sHz", len(resampled_int16), sample_rate)
+        
+        return audio_data, sample_rate
+
     async def close(self):
         """Close the connection"""
         self.running = False
@@ -527,7 +566,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
         
         # Send configuration confirmation
         logger.info(f"📤 Sending configuration confirmation to client: {client_id}")
-        await websocket.send_json({
+        await send_json(websocket, {
             "type": "status",
             "status": "config_received",
             "text": f"Configuration received for {mode} mode"
@@ -542,7 +581,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
             
             # Send connection success message
             logger.info(f"📤 Sending connection success message to client: {client_id}")
-            await websocket.send_json({
+            await send_json(websocket, {
                 "type": "status", 
                 "status": "connected",
                 "text": "Connected to AI service successfully"
@@ -553,7 +592,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
             logger.error(f"❌ Error details: {str(e)}")
             import traceback
             logger.error(f"❌ Traceback: {traceback.format_exc()}")
-            await websocket.send_json({
+            await send_json(websocket, {
                 "type": "error",
                 "text": f"Failed to connect to AI service: {str(e)}"
             })
@@ -573,7 +612,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                             logger.info("Received disconnect message")
                             return
                             
-                        message_content = json.loads(message["text"])
+                        message_content = json_loads(message["text"])
                         msg_type = message_content["type"]
                         
                         if msg_type == "audio":
@@ -590,7 +629,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                             
                             # Echo back for confirmation/storage
                             try:
-                                await websocket.send_json({
+                                await send_json(websocket, {
                                     "type": "transcription",
                                     "role": "user",
                                     "text": user_text,
@@ -623,7 +662,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                                     
                                     # Send transcription to frontend
                                     try:
-                                        await websocket.send_json({
+                                        await send_json(websocket, {
                                             "type": "turn_complete",
                                             "role": "assistant",
                                             "text": transcription,
@@ -672,7 +711,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                         
                     try:
                         message_count += 1
-                        response = json.loads(msg)
+                        response = json_loads(msg)
                         
                         if "serverContent" in response:
                             server_content = response["serverContent"]
@@ -684,8 +723,9 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                                     parts = model_turn["parts"]
                                     
                                     for i, part in enumerate(parts):
-                                        # Log what keys are in each part
-                                        logger.debug(f"Part {i} contains keys: {list(part.keys())}")
+                                        # Log what keys are in each part (one per audio chunk, so skip the list when DEBUG is off)
+                                        if logger.isEnabledFor(logging.DEBUG):
+                                            logger.debug("Part %d contains keys: %s", i, list(part.keys()))
                                         
                                         # Check if Gemini sent text (unlikely but possible)
                                         if "text" in part:
@@ -694,7 +734,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                                             
                                             # Send transcription to frontend immediately
                                             try:
-                                                await websocket.send_json({
+                                                await send_json(websocket, {
                                                     "type": "transcription",
                                                     "role": "assistant",
                                                     "text": text_content,
@@ -715,7 +755,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                                             # Send audio to frontend for playback
                                             # Frontend will track which chunks are actually played!
                                             try:
-                                                await websocket.send_json({
+                                                await send_json(websocket, {
                                                     "type": "audio",
                                                     "data": audio_data_b64,
                                                     "mimeType": mime_type
@@ -731,7 +771,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                                 # Send listening status to frontend
                                 # Frontend will then send played audio chunks for transcription
                                 try:
-                                    await websocket.send_json({
+                                    await send_json(websocket, {
                                         "type": "status",
                                         "status": "listening"
                                     })
@@ -767,7 +807,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                                                     mime_type = inline_data.get("mimeType", "audio/opus")  # Default to Opus for Gemini Live API
                                                     
                                                     try:
-                                                        await websocket.send_json({
+                                                        await send_json(websocket, {
                                                             "type": "audio",
                                                             "data": audio_data_b64,
                                                             "mimeType": mime_type
@@ -775,8 +815,8 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                                                         logger.info("Audio data sent to frontend from candidates")
                                                     except Exception as send_error:
                                                         logger.error(f"Error sending audio from candidates: {send_error}")
-                            else:
-                                logger.debug(f"Full response: {json.dumps(response, indent=2)}")
+                            elif logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("Full response: %s", json.dumps(response, indent=2))
                             
                     except Exception as receive_error:
                         logger.error(f"Error processing Gemini response: {receive_error}")
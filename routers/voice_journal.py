@@ -5,13 +5,14 @@ Handles voice journal session completion, wellness analysis triggering,
 and analysis result polling using Firestore for real-time sync.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import Optional
 import uuid
 import json
 import sys
 from pathlib import Path
 import asyncio
+import logging
 from datetime import datetime
 from google.cloud.firestore_v1 import SERVER_TIMESTAMP
 
@@ -26,18 +27,21 @@ from model import (
 )
 from firebase_db import get_firestore
 from utils import get_current_user
+from rate_limit import rate_limit, ANALYSIS_RATE_LIMIT
+
+logger = logging.getLogger(__name__)
 
 # Import orchestrator
 try:
     from agents.orchestrator import run_wellness_analysis
 except ImportError as e:
-    print(f"Warning: Could not import orchestrator: {e}")
+    logger.warning(f"Could not import orchestrator: {e}")
     run_wellness_analysis = None
 
 router = APIRouter(prefix="/voice_journal", tags=["voice_journal"])
 
 
-@router.post("/complete")
+@router.post("/complete", dependencies=[Depends(rate_limit("analysis", ANALYSIS_RATE_LIMIT))])
 async def complete_voice_journal_session(
     session_data: VoiceJournalSessionInput,
     current_user = Depends(get_current_user),
@@ -52,21 +56,18 @@ async def complete_voice_journal_session(
     4. Frontend can use real-time listener instead of polling!
     """
     try:
-        print(f"📥 Voice journal complete endpoint called")
-        print(f"   Mode: {session_data.mode}")
-        print(f"   Mode value: {session_data.mode.value}")
-        print(f"   Transcript length: {len(session_data.transcript)}")
-        print(f"   Duration: {session_data.duration_seconds}")
-        print(f"👤 User: {current_user.user_id} ({current_user.username})")
+        logger.debug(
+            "📥 Voice journal complete: mode=%s, transcript=%d chars, duration=%ss, user=%s (%s)",
+            session_data.mode.value, len(session_data.transcript), session_data.duration_seconds,
+            current_user.user_id, current_user.username,
+        )
         
         db = get_firestore()
-        print(f"✅ Firestore client obtained")
         
         user_id = str(current_user.user_id)
         
         # Generate session ID
         session_id = str(uuid.uuid4())
-        print(f"📝 Generated session ID: {session_id}")
         
         # Create voice journal session document
         session_doc = {
@@ -79,14 +80,12 @@ async def complete_voice_journal_session(
             "created_at": SERVER_TIMESTAMP,
         }
         
-        print(f"💾 Saving to Firestore collection: voiceJournalSessions")
         # Save to Firestore
         sessions_ref = db.collection('voiceJournalSessions')
         sessions_ref.document(session_id).set(session_doc)
-        print(f"✅ Successfully saved session to Firestore")
+        logger.info(f"💾 Saved voice journal session {session_id}, starting analysis")
         
         # Start analysis in background (non-blocking)
-        print(f"🚀 Starting background analysis task...")
         asyncio.create_task(
             process_analysis_async(
                 session_id=session_id,
@@ -95,7 +94,6 @@ async def complete_voice_journal_session(
                 user_id=user_id
             )
         )
-        print(f"✅ Background analysis task started")
         
         response_data = {
             "message": "Voice journal session saved. Analysis started.",
@@ -103,14 +101,10 @@ async def complete_voice_journal_session(
             "mode": session_data.mode.value,
             "analysis_status": "processing",
         }
-        print(f"📤 Returning response: {response_data}")
-        
         return response_data
         
     except Exception as e:
-        print(f"❌ ERROR in complete_voice_journal_session: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ Error in complete_voice_journal_session: {type(e).__name__}: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to save voice journal session: {str(e)}"
@@ -122,10 +116,10 @@ async def process_analysis_async(session_id: str, transcript: str, mode: Wellnes
     Process wellness analysis in background
     Updates Firestore when complete (real-time sync!)
     """
-    print(f"🧠 [ANALYSIS] Starting analysis for session {session_id}")
-    print(f"   Mode: {mode}")
-    print(f"   User ID: {user_id}")
-    print(f"   Transcript length: {len(transcript)}")
+    logger.debug(
+        "🧠 [ANALYSIS] Starting analysis for session %s: mode=%s, user=%s, transcript=%d chars",
+        session_id, mode, user_id, len(transcript),
+    )
     
     db = get_firestore()
     session_ref = db.collection('voiceJournalSessions').document(session_id)
@@ -134,7 +128,6 @@ async def process_analysis_async(session_id: str, transcript: str, mode: Wellnes
         if run_wellness_analysis is None:
             raise Exception("Wellness analysis service not available")
         
-        print(f"🔄 [ANALYSIS] Running wellness analysis agents...")
         # Run analysis - mode is already WellnessMode enum
         analysis_result = await run_wellness_analysis(
             transcript=transcript,
@@ -143,9 +136,6 @@ async def process_analysis_async(session_id: str, transcript: str, mode: Wellnes
             session_id=session_id
         )
         
-        print(f"✅ [ANALYSIS] Analysis completed successfully")
-        print(f"   Result type: {type(analysis_result)}")
-        
         # Update Firestore document with results (real-time sync!)
         # Handle both dict and Pydantic model responses
         if isinstance(analysis_result, dict):
@@ -158,24 +148,18 @@ async def process_analysis_async(session_id: str, transcript: str, mode: Wellnes
             # Fallback: try to convert to dict
             analysis_dict = dict(analysis_result) if analysis_result else {}
         
-        print(f"📊 [ANALYSIS] Analysis has transcript_summary: {'transcript_summary' in analysis_dict}")
-        print(f"📊 [ANALYSIS] Analysis has stats_recommendations: {'stats_recommendations' in analysis_dict}")
-        
         update_data = {
             "analysis_data": analysis_dict,
             "analysis_completed": True,
             "updated_at": SERVER_TIMESTAMP,
         }
         
-        print(f"💾 [ANALYSIS] Updating Firestore...")
         session_ref.update(update_data)
         
-        print(f"✅✅✅ Analysis completed and saved for session {session_id}")
+        logger.info(f"✅ [ANALYSIS] Analysis completed and saved for session {session_id}")
         
     except Exception as e:
-        print(f"❌ [ANALYSIS] Analysis failed for session {session_id}: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ [ANALYSIS] Analysis failed for session {session_id}: {type(e).__name__}: {str(e)}")
         
         # Update session to show failure
         try:
@@ -188,9 +172,8 @@ async def process_analysis_async(session_id: str, transcript: str, mode: Wellnes
                 "updated_at": SERVER_TIMESTAMP,
             }
             session_ref.update(error_data)
-            print(f"📝 [ANALYSIS] Updated session with error status")
         except Exception as update_error:
-            print(f"❌ [ANALYSIS] Failed to update session with error: {update_error}")
+            logger.error(f"❌ [ANALYSIS] Failed to update session with error: {update_error}")
 
 
 @router.get("/analysis/{session_id}")
@@ -328,7 +311,9 @@ async def get_user_sessions(
 
 @router.get("/summaries")
 async def get_voice_journal_summaries(
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[datetime] = None,
+    after_id: Optional[str] = None,
     current_user = Depends(get_current_user),
 ):
     """
@@ -341,24 +326,51 @@ async def get_voice_journal_summaries(
     - Key insights
     
     Used for the right-hand summary panel in voice agent UI
+
+    Paginated by (`created_at`, document id): pass the returned `next_after`
+    and `next_after_id` as `?after=&after_id=` to fetch the next page (both
+    null once there are no more sessions).
     """
     try:
         db = get_firestore()
         user_id = str(current_user.user_id)
         
-        # Query Firestore - ONLY filter by user_id (no orderBy to avoid index requirement)
+        # Newest first via the (user_id, created_at DESC) index in firestore.indexes.json
+        # (its implicit __name__ DESC covers the tie-break, so sessions sharing a
+        # created_at aren't skipped between pages); the stream pages lazily, so
+        # we stop reading once the page is full
         sessions_ref = db.collection('voiceJournalSessions')
-        query = sessions_ref.where('user_id', '==', user_id)
+        query = sessions_ref.where('user_id', '==', user_id)\
+                           .order_by('created_at', direction='DESCENDING')\
+                           .order_by('__name__', direction='DESCENDING')
+        if after is not None:
+            cursor = [after]
+            if after_id:
+                cursor.append(sessions_ref.document(after_id))
+            query = query.start_after(cursor)
         
         sessions_docs = query.stream()
         
-        # Collect all sessions with timestamps for sorting
-        sessions_with_timestamps = []
+        summaries = []
+        next_after = None
+        next_after_id = None
+        last_created_at = None
+        last_id = None
         
         for doc in sessions_docs:
+            if len(summaries) == limit:
+                # Resume after the last document read, including any filtered
+                # out below, so the next page doesn't scan them again
+                next_after = last_created_at.isoformat()
+                next_after_id = last_id
+                break
+            data = doc.to_dict()
+            # Legacy documents without a usable created_at can't be a cursor; skip them
+            created_at_dt = data.get("created_at")
+            if not isinstance(created_at_dt, datetime):
+                continue
+            last_created_at, last_id = created_at_dt, doc.id
             try:
-                data = doc.to_dict()
-                
                 # Skip if analysis not completed
                 if not data.get("analysis_completed", False):
                     continue
@@ -371,22 +383,6 @@ async def get_voice_journal_summaries(
                 if not transcript_summary:
                     continue
                 
-                # Parse created_at timestamp for sorting
-                created_at = data.get("created_at")
-                if hasattr(created_at, 'isoformat'):
-                    created_at_dt = created_at
-                    timestamp_for_sort = created_at.timestamp()
-                elif isinstance(created_at, str):
-                    try:
-                        created_at_dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        timestamp_for_sort = created_at_dt.timestamp()
-                    except:
-                        created_at_dt = datetime.utcnow()
-                        timestamp_for_sort = created_at_dt.timestamp()
-                else:
-                    created_at_dt = datetime.utcnow()
-                    timestamp_for_sort = created_at_dt.timestamp()
-                
                 # Format duration
                 duration_seconds = data.get("duration_seconds", 0)
                 duration_str = f"{duration_seconds // 60} min" if duration_seconds >= 60 else f"{duration_seconds} sec"
@@ -406,31 +402,20 @@ async def get_voice_journal_summaries(
                     "stress_level": transcript_summary.get("stress_level"),
                     "academic_concerns": transcript_summary.get("academic_concerns", []),
                     "key_insights": transcript_summary.get("key_insights", []),
-                    "_timestamp": timestamp_for_sort  # For sorting
+                    "created_at": created_at_dt.isoformat(),
                 }
                 
-                sessions_with_timestamps.append(summary)
+                summaries.append(summary)
                     
             except Exception as doc_error:
-                print(f"⚠️ Error processing document {doc.id}: {doc_error}")
+                logger.warning(f"⚠️ Error processing document {doc.id}: {doc_error}")
                 continue
         
-        # Sort by timestamp (most recent first) in Python
-        sessions_with_timestamps.sort(key=lambda x: x.get('_timestamp', 0), reverse=True)
-        
-        # Remove timestamp and limit results
-        summaries = []
-        for summary in sessions_with_timestamps[:limit]:
-            summary.pop('_timestamp', None)
-            summaries.append(summary)
-        
-        print(f"✅ Returning {len(summaries)} summaries for user {user_id}")
-        return {"summaries": summaries}
+        logger.debug("✅ Returning %d summaries for user %s", len(summaries), user_id)
+        return {"summaries": summaries, "next_after": next_after, "next_after_id": next_after_id}
         
     except Exception as e:
-        print(f"❌ Error fetching summaries: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"❌ Error fetching summaries: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving summaries: {str(e)}"
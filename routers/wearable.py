@@ -9,6 +9,7 @@ from fastapi import APIRouter, HTTPException, status
 from datetime import datetime, date
 from google.cloud.firestore_v1 import SERVER_TIMESTAMP
 from typing import Optional, Dict, Any
+import logging
 import uuid
 import random
 import os
@@ -22,6 +23,8 @@ from model import (
 )
 from utils import TokenDep
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["Wearable"])
 
 # Google Cloud IoT Core configuration (mock/non-breaking)
@@ -37,7 +40,7 @@ def mock_iot_core_publish(device_id: str, data: Dict[str, Any]) -> bool:
     """
     if not IOT_CORE_ENABLED:
         # Silent mock - just log that it would publish
-        print(f"[IoT Core Mock] Would publish data for device {device_id}")
+        logger.info(f"[IoT Core Mock] Would publish data for device {device_id}")
         return True
     
     try:
@@ -45,10 +48,10 @@ def mock_iot_core_publish(device_id: str, data: Dict[str, Any]) -> bool:
         # from google.cloud import iot_v1
         # client = iot_v1.DeviceManagerClient()
         # client.send_command_to_device(...)
-        print(f"[IoT Core] Publishing data for device {device_id} (mock mode)")
+        logger.info(f"[IoT Core] Publishing data for device {device_id} (mock mode)")
         return True
     except Exception as e:
-        print(f"[IoT Core] Error publishing (non-breaking): {e}")
+        logger.error(f"[IoT Core] Error publishing (non-breaking): {e}")
         return False  # Non-breaking - returns False but doesn't fail request
 
 
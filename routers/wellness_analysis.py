@@ -30,18 +30,23 @@ from model import (
 )
 from firebase_db import get_firestore
 from utils import get_current_user
+from rate_limit import rate_limit, ANALYSIS_RATE_LIMIT
 
 # Import orchestrator
 try:
-    from agents.orchestrator import sync_run_wellness_analysis, map_priority_to_quadrant, calculate_due_date
+    from agents.orchestrator import run_wellness_analysis, map_priority_to_quadrant, calculate_due_date
 except ImportError as e:
-    print(f"Warning: Could not import orchestrator: {e}")
-    sync_run_wellness_analysis = None
+    logger.warning(f"Could not import orchestrator: {e}")
+    run_wellness_analysis = None
 
 router = APIRouter(prefix="/wellness", tags=["wellness_analysis"])
 
 
-@router.post("/analyze", response_model=VoiceJournalAnalysisResult)
+@router.post(
+    "/analyze",
+    response_model=VoiceJournalAnalysisResult,
+    dependencies=[Depends(rate_limit("analysis", ANALYSIS_RATE_LIMIT))],
+)
 async def trigger_wellness_analysis(
     input_data: TriggerAnalysisInput,
     current_user = Depends(get_current_user),
@@ -54,15 +59,15 @@ async def trigger_wellness_analysis(
     2. Returns structured analysis with transcript summary and recommendations
     3. Summary goes under transcript, recommendations/tasks go in stats area
     """
-    if sync_run_wellness_analysis is None:
+    if run_wellness_analysis is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Wellness analysis service is not available"
         )
     
     try:
-        # Run analysis
-        result = sync_run_wellness_analysis(
+        # Run analysis on the server loop, where the shared MCP session lives
+        result = await run_wellness_analysis(
             transcript=input_data.transcript,
             mode=input_data.mode.value,
             user_id=str(current_user.user_id),
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from pwdlib import PasswordHash
+import logging
 import jwt
 from jwt.exceptions import InvalidTokenError
 from fastapi.security import OAuth2PasswordBearer
@@ -22,6 +23,8 @@ except ImportError:
     # If db.py doesn't exist or SessionDep not available, define a type alias
     SessionDep = Optional[object]  # Placeholder type
 
+logger = logging.getLogger(__name__)
+
 password_hash = PasswordHash.recommended()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
@@ -152,6 +155,9 @@ def add_user_to_default_servers(user_id: str):
         # Default server names (these should match what's in seed script)
         default_server_names = ["General Community", "Study Hub", "Wellness & Mindfulness"]
         
+        # All membership writes go out in one commit
+        batch = db.batch()
+        
         for server_doc in servers:
             server_data = server_doc.to_dict()
             server_name = server_data.get('name', '')
@@ -163,7 +169,7 @@ def add_user_to_default_servers(user_id: str):
                 # Add user to server's member_ids (if not already there)
                 member_ids = server_data.get('member_ids', [])
                 if user_id not in member_ids:
-                    server_doc.reference.update({
+                    batch.update(server_doc.reference, {
                         "member_ids": ArrayUnion([user_id])
                     })
                 
@@ -176,14 +182,15 @@ def add_user_to_default_servers(user_id: str):
                 
                 if not list(existing_membership):
                     membership_id = str(uuid.uuid4())
-                    memberships_ref.document(membership_id).set({
+                    batch.set(memberships_ref.document(membership_id), {
                         "server_id": server_id,
                         "user_id": user_id,
                         "role": "member",
                         "joined_at": SERVER_TIMESTAMP,
                     })
         
-        print(f"✅ Added user {user_id} to default servers")
+        batch.commit()
+        logger.info(f"✅ Added user {user_id} to default servers")
     except Exception as e:
         # Don't fail signup if server addition fails
-        print(f"⚠️ Warning: Could not add user to default servers: {e}")
+        logger.warning(f"⚠️ Warning: Could not add user to default servers: {e}")